@@ -176,6 +176,15 @@ class DatabaseManager:
                     cursor.execute("ALTER TABLE deals MODIFY COLUMN product_name VARCHAR(500)")
                 except pymysql.Error as e:
                     print(f"Migration Note (Deals): {e}")
+
+                # Index the recency sort behind the active-deals / history reads
+                # so they don't filesort the whole deals table
+                try:
+                    cursor.execute("SHOW INDEX FROM deals WHERE Key_name = 'idx_deals_created_at'")
+                    if not cursor.fetchone():
+                        cursor.execute("CREATE INDEX idx_deals_created_at ON deals (created_at)")
+                except pymysql.Error as e:
+                    print(f"Migration Note (Deals index): {e}")
         finally:
             conn.close()
 
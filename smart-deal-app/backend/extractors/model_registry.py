@@ -20,6 +20,7 @@ class ModelRegistry:
     def __init__(self):
         self._models: Dict[str, Type[BaseExtractor]] = {}
         self._instances: Dict[str, BaseExtractor] = {}
+        self._infos: Dict[str, Dict] = {}
 
     def register(self, name: str, extractor_class: Type[BaseExtractor]):
         """
@@ -30,6 +31,8 @@ class ModelRegistry:
             extractor_class: The extractor class (not instance)
         """
         self._models[name] = extractor_class
+        self._instances.pop(name, None)
+        self._infos.pop(name, None)
 
     def get(self, name: str) -> BaseExtractor:
         """
@@ -47,6 +50,29 @@ class ModelRegistry:
             self._instances[name] = self._models[name]()
         return self._instances[name]
 
+    def get_info(self, name: str) -> Dict:
+        """
+        Get the info dictionary of a registered model.
+
+        Info (including the availability check) is built once per model;
+        call refresh() after installing dependencies at runtime.
+
+        Args:
+            name: Model identifier
+
+        Returns:
+            Model info dictionary (a copy, safe to modify)
+        """
+        if name not in self._infos:
+            info = self.get(name).get_info()
+            info['id'] = name
+            self._infos[name] = info
+        return dict(self._infos[name])
+
+    def refresh(self):
+        """Drop cached model info so availability is checked again."""
+        self._infos.clear()
+
     def list_available(self) -> List[Dict]:
         """
         List all available (ready to use) models.
@@ -54,15 +80,7 @@ class ModelRegistry:
         Returns:
             List of model info dictionaries
         """
-        available = []
-        for name, extractor_class in self._models.items():
-            # Create temporary instance to check availability
-            instance = extractor_class()
-            if instance.is_available():
-                info = instance.get_info()
-                info['id'] = name
-                available.append(info)
-        return available
+        return [info for info in self.list_all() if info.get('available')]
 
     def list_all(self) -> List[Dict]:
         """
@@ -71,13 +89,7 @@ class ModelRegistry:
         Returns:
             List of model info dictionaries
         """
-        all_models = []
-        for name, extractor_class in self._models.items():
-            instance = extractor_class()
-            info = instance.get_info()
-            info['id'] = name
-            all_models.append(info)
-        return all_models
+        return [self.get_info(name) for name in self._models]
 
 
 # Global registry instance
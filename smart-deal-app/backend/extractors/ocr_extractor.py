@@ -5,6 +5,7 @@ Simple and fast extraction using OCR + pattern matching.
 """
 
 import sys
+import importlib.util
 from pathlib import Path
 import numpy as np
 from typing import Dict
@@ -25,6 +26,8 @@ class TesseractExtractor(BaseExtractor):
 
     def is_available(self) -> bool:
         """Check if Tesseract is available"""
+        if importlib.util.find_spec("pytesseract") is None:
+            return False
         try:
             import pytesseract
             pytesseract.get_tesseract_version()
@@ -85,12 +88,8 @@ class PaddleOCRExtractor(BaseExtractor):
         super().__init__("PaddleOCR")
 
     def is_available(self) -> bool:
-        """Check if PaddleOCR is available"""
-        try:
-            import paddleocr
-            return True
-        except:
-            return False
+        """Check if PaddleOCR is installed (without importing paddle itself)"""
+        return importlib.util.find_spec("paddleocr") is not None
 
     def extract(self, image: np.ndarray, **kwargs) -> Dict:
         """Extract deals using PaddleOCR"""
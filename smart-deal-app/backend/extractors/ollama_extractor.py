@@ -2,48 +2,149 @@
 
 import json
 import base64
+import hashlib
+import importlib.util
 import os
+import re
+import time
+from functools import lru_cache
 from io import BytesIO
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import numpy as np
 from PIL import Image
 
-
-def get_ollama_client():
-    """Get Ollama client with proper host configuration"""
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Sampling options shared by every extraction request
+GENERATE_OPTIONS = {
+    "temperature": 0.1,  # Low temperature for consistent extraction
+    "num_predict": 2048  # Max tokens for response
+}
+
+# Pages are sent to the model as JPEG at this quality
+OLLAMA_JPEG_QUALITY = 90
+
+# Keep the model (and its prompt KV cache) loaded between pages; Ollama's
+# default unloads it after 5 idle minutes
+OLLAMA_KEEP_ALIVE = "30m"
+
+# Successful extractions keyed by (model, language, image content hash), so
+# re-submitting the same page skips the VLM call entirely
+_response_cache: Dict[tuple, Dict] = {}
+_response_cache_max_size = 64
+
+# Response cleanup pattern, compiled once at import
+CODE_FENCE_RE = re.compile(r'```(?:json)?\s*')
+
+# Cheap install check; the package itself is only imported on first use
+OLLAMA_AVAILABLE = importlib.util.find_spec("ollama") is not None
+
+# One synchronous client for the process, so every list/show/generate/pull
+# call reuses its HTTP connection pool instead of opening a new one
+_ollama_client = None
+_ollama_client_kwargs: Optional[Dict] = None
+
+# Installed vision models (one list() plus a show() per model), cached briefly
+OLLAMA_MODELS_TTL_SECONDS = 30
+_vision_models_cache: Optional[List[Dict]] = None
+_vision_models_cached_at = 0.0
+# Names of all installed models, for download checks, on the same TTL
+_downloaded_names_cache: Optional[frozenset] = None
+_downloaded_names_cached_at = 0.0
+# Daemon reachability, cached on the same TTL (one list() per check otherwise)
+_ollama_available_cache: Optional[bool] = None
+_ollama_available_checked_at = 0.0
+
+
+@lru_cache(maxsize=1)
+def _try_import_ollama():
+    """Import the ollama package once, or return None if it is unavailable"""
+    if not OLLAMA_AVAILABLE:
+        return None
     try:
         import ollama
+        return ollama
+    except ImportError:
+        return None
 
-        # Check if custom host is set (for Docker deployment)
-        ollama_host = os.getenv('OLLAMA_HOST')
-        if ollama_host:
-            return ollama.Client(host=ollama_host)
-        else:
-            return ollama.Client()
+
+def _client_kwargs() -> Dict:
+    """Client options; a custom host is set for Docker deployment"""
+    ollama_host = os.getenv('OLLAMA_HOST')
+    return {"host": ollama_host} if ollama_host else {}
+
+
+def get_ollama_client():
+    """Get the shared Ollama client (rebuilt only if OLLAMA_HOST changes)"""
+    global _ollama_client, _ollama_client_kwargs
+    ollama = _try_import_ollama()
+    if ollama is None:
+        return None
+    kwargs = _client_kwargs()
+    if _ollama_client is not None and kwargs == _ollama_client_kwargs:
+        return _ollama_client
+    try:
+        _ollama_client = ollama.Client(**kwargs)
+        _ollama_client_kwargs = kwargs
+        return _ollama_client
     except Exception as e:
         print(f"Failed to create Ollama client: {e}")
         return None
 
 
-def check_ollama_available() -> bool:
-    """Check if Ollama service is running"""
+def check_ollama_available(refresh: bool = False) -> bool:
+    """Check if Ollama service is running (cached for OLLAMA_MODELS_TTL_SECONDS)"""
+    global _ollama_available_cache, _ollama_available_checked_at
+    now = time.time()
+    if not refresh and _ollama_available_cache is not None and now - _ollama_available_checked_at <= OLLAMA_MODELS_TTL_SECONDS:
+        return _ollama_available_cache
     try:
         client = get_ollama_client()
         if client is None:
-            return False
-        client.list()
-        return True
+            available = False
+        else:
+            client.list()
+            available = True
     except Exception:
-        return False
+        available = False
+    _ollama_available_cache = available
+    _ollama_available_checked_at = now
+    return available
 
 
-def get_available_ollama_models() -> List[Dict]:
+def get_available_ollama_models(refresh: bool = False) -> List[Dict]:
     """
     Get list of actually installed vision-capable Ollama models
-    
+
+    The list is cached for OLLAMA_MODELS_TTL_SECONDS and dropped whenever a
+    model is pulled or deleted through this module.
+
+    Args:
+        refresh: Query Ollama even if a cached list is still fresh
+
     Returns:
         List of model dictionaries with info
     """
+    global _vision_models_cache, _vision_models_cached_at
+    now = time.time()
+    if refresh or _vision_models_cache is None or now - _vision_models_cached_at > OLLAMA_MODELS_TTL_SECONDS:
+        _vision_models_cache = _list_vision_models()
+        _vision_models_cached_at = now
+    return [dict(m) for m in _vision_models_cache]
+
+
+def invalidate_ollama_models_cache():
+    """Forget the cached vision model list and downloaded model names"""
+    global _vision_models_cache, _downloaded_names_cache
+    _vision_models_cache = None
+    _downloaded_names_cache = None
+
+
+def _list_vision_models() -> List[Dict]:
+    """Query Ollama for installed models and keep the vision-capable ones"""
     try:
         client = get_ollama_client()
         if not client:
@@ -71,12 +172,21 @@ def get_available_ollama_models() -> List[Dict]:
                 # Only include models that explicitly support vision
                 if 'vision' in capabilities:
                     size_gb = size_bytes / (1024**3)
+                    # Weight precision (e.g. Q4_K_M, F16); decode speed at
+                    # batch size 1 scales with weight bytes, so it is shown
+                    # next to the size when picking a model
+                    details = getattr(info, 'details', None)
+                    quantization = getattr(details, 'quantization_level', None) or ""
+                    description = f"Local Vision model. Size: {size_gb:.1f} GB"
+                    if quantization:
+                        description += f", {quantization}"
                     
                     vision_models.append({
                         "name": model_id.split(':')[0].replace('-', ' ').capitalize(),
                         "model_id": model_id,
-                        "description": f"Local Vision model. Size: {size_gb:.1f} GB",
+                        "description": description,
                         "size": f"{size_gb:.1f} GB",
+                        "quantization": quantization,
                         "speed": "Fast (Local)",
                         "accuracy": "⭐⭐⭐⭐",
                         "downloaded": True
@@ -94,10 +204,29 @@ def get_available_ollama_models() -> List[Dict]:
         return []
 
 
+def _list_downloaded_names() -> frozenset:
+    """Names of installed models, cached for OLLAMA_MODELS_TTL_SECONDS"""
+    global _downloaded_names_cache, _downloaded_names_cached_at
+    now = time.time()
+    if _downloaded_names_cache is not None and now - _downloaded_names_cached_at <= OLLAMA_MODELS_TTL_SECONDS:
+        return _downloaded_names_cache
+    client = get_ollama_client()
+    if not client:
+        return frozenset()
+    downloaded_models = client.list()
+    _downloaded_names_cache = frozenset(m['name'] for m in downloaded_models.get('models', []))
+    _downloaded_names_cached_at = now
+    return _downloaded_names_cache
+
+
 def check_model_downloaded(model_id: str) -> bool:
     """
     Check if a specific Ollama model is downloaded
 
+    The installed names are cached for OLLAMA_MODELS_TTL_SECONDS and dropped
+    when a model is pulled or deleted through this module, so extraction
+    calls do not each pay a list() round-trip.
+
     Args:
         model_id: Ollama model identifier (e.g., "llava:7b-v1.6")
 
@@ -105,21 +234,17 @@ def check_model_downloaded(model_id: str) -> bool:
         True if model is downloaded
     """
     try:
-        client = get_ollama_client()
-        if not client:
-            return False
-        downloaded_models = client.list()
-        downloaded_names = {m['name'] for m in downloaded_models.get('models', [])}
+        downloaded_names = _list_downloaded_names()
+        if model_id in downloaded_names:
+            return True
 
         model_base = model_id.split(':')[0]
-        return any(
-            model_id in name or model_base in name
-            for name in downloaded_names
-        )
+        return any(model_base in name for name in downloaded_names)
     except Exception:
         return False
 
 
+@lru_cache(maxsize=8)
 def get_extraction_prompt(language: str = "German") -> str:
     """
     Get the extraction prompt for Ollama models
@@ -128,7 +253,8 @@ def get_extraction_prompt(language: str = "German") -> str:
         language: Primary language of the brochure
 
     Returns:
-        Prompt string
+        Prompt string (the same object on every call, so the prefix sent to
+        Ollama is byte-identical and its prompt cache can be reused)
     """
     if language == "German":
         return """Analyze this German supermarket brochure page and extract ALL product deals.
@@ -169,7 +295,7 @@ Return ONLY a valid JSON array. Extract ALL products on the page."""
 
 
 def extract_with_ollama(
-    image_array: np.ndarray,
+    image_array: Union[np.ndarray, Image.Image],
     model_id: str = "llava:7b-v1.6",
     language: str = "German"
 ) -> Dict:
@@ -177,7 +303,7 @@ def extract_with_ollama(
     Extract product information using Ollama VLM
 
     Args:
-        image_array: Image as numpy array
+        image_array: Image as numpy array, or a PIL image (used as-is)
         model_id: Ollama model identifier
         language: Primary language in brochure
 
@@ -191,28 +317,17 @@ def extract_with_ollama(
             "Install with: pip install ollama"
         )
 
-    # Convert numpy array to PIL Image
-    if len(image_array.shape) == 2:
-        pil_image = Image.fromarray(image_array)
-    else:
-        pil_image = Image.fromarray(image_array)
-
-    # Convert to base64 for Ollama
-    buffered = BytesIO()
-    pil_image.save(buffered, format="PNG")
-    img_base64 = base64.b64encode(buffered.getvalue()).decode()
+    img_base64 = encode_image(image_array)
+    cache_key = response_cache_key(img_base64, model_id, language)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
 
     # Get extraction prompt
     prompt = get_extraction_prompt(language)
 
     # Check if model is downloaded
-    if not check_model_downloaded(model_id):
-        print(f"⬇️  Downloading {model_id} model (first time only)...")
-        print(f"This may take a few minutes depending on your connection...")
-        try:
-            client.pull(model_id)
-        except Exception as pull_err:
-            print(f"Error pulling model {model_id}: {pull_err}")
+    ensure_model_downloaded(client, model_id)
 
     try:
         # Call Ollama API
@@ -221,67 +336,198 @@ def extract_with_ollama(
             prompt=prompt,
             images=[img_base64],
             stream=False,
-            options={
-                "temperature": 0.1,  # Low temperature for consistent extraction
-                "num_predict": 2048  # Max tokens for response
-            }
+            options=GENERATE_OPTIONS,
+            keep_alive=OLLAMA_KEEP_ALIVE
         )
+        result = build_extraction_result(response['response'], model_id, prompt)
+        cache_response(cache_key, result)
+        return result
+
+    except Exception as e:
+        return build_error_result(e, model_id, prompt)
 
-        # Extract response text
-        response_text = response['response']
 
-        # Log the raw response for debugging
-        print(f"[DEBUG] Ollama raw response (first 500 chars): {response_text[:500]}")
+def encode_image(image_array: Union[np.ndarray, Image.Image]) -> str:
+    """
+    Encode a page for the Ollama images field
 
-        # Try to parse JSON from response
-        deals = parse_json_from_response(response_text)
+    Args:
+        image_array: Image as numpy array, or a PIL image (used as-is)
 
-        if not deals:
-            print(f"[DEBUG] Failed to parse JSON. Full response: {response_text}")
-            return {
-                "deals": [],
-                "total_products": 0,
-                "extraction_method": f"Ollama {model_id}",
-                "status": "error",
-                "error": "No valid products extracted",
-                "raw_input": prompt,
-                "raw_response": response_text
-            }
+    Returns:
+        Base64-encoded JPEG
+    """
+    # Convert numpy array to PIL Image (PIL input skips the array round-trip)
+    if isinstance(image_array, Image.Image):
+        pil_image = image_array
+    else:
+        # fromarray wraps a C-contiguous uint8 buffer directly (2-D as L,
+        # 3-D as RGB/RGBA); strided views or other dtypes are copied once
+        if image_array.dtype != np.uint8 or not image_array.flags['C_CONTIGUOUS']:
+            image_array = np.ascontiguousarray(image_array, dtype=np.uint8)
+        pil_image = Image.fromarray(image_array)
 
-        # Calculate confidence based on completeness
-        avg_confidence = calculate_confidence(deals)
+    # JPEG encodes brochure photos far faster than PNG's deflate and gives a
+    # much smaller request body; it has no alpha or palette modes
+    if pil_image.mode not in ("RGB", "L"):
+        pil_image = pil_image.convert("RGB")
 
-        return {
-            "deals": deals,
-            "total_products": len(deals),
-            "average_confidence": avg_confidence,
-            "extraction_method": f"Ollama {model_id}",
-            "model_info": {
-                "model": model_id,
-                "provider": "Ollama (Local)"
-            },
-            "status": "success",
-            "raw_input": prompt,
-            "raw_response": response_text
-        }
+    # Convert to base64 for Ollama, straight from the buffer (no getvalue copy)
+    buffered = BytesIO()
+    pil_image.save(buffered, format="JPEG", quality=OLLAMA_JPEG_QUALITY)
+    return base64.b64encode(buffered.getbuffer()).decode()
 
-    except Exception as e:
-        error_msg = str(e)
 
-        # Provide helpful error messages
-        if "model" in error_msg.lower() and "not found" in error_msg.lower():
-            error_msg = f"Model {model_id} not found. Please ensure it is available in Ollama."
+def response_cache_key(img_base64: str, model_id: str, language: str) -> tuple:
+    """
+    Key for the extraction response cache
+
+    Args:
+        img_base64: Encoded page as sent to Ollama
+        model_id: Ollama model identifier
+        language: Primary language in brochure
+
+    Returns:
+        Tuple of model, language and page content hash
+    """
+    return (model_id, language, hashlib.sha256(img_base64.encode()).hexdigest())
+
+
+def get_cached_response(key: tuple) -> Optional[Dict]:
+    """
+    Look up a cached extraction result
+
+    Args:
+        key: Key from response_cache_key
+
+    Returns:
+        A copy of the cached result, or None
+    """
+    result = _response_cache.get(key)
+    if result is None:
+        return None
+    return {**result, "deals": [dict(deal) for deal in result["deals"]]}
+
+
+def cache_response(key: tuple, result: Dict):
+    """
+    Remember a successful extraction result
+
+    Args:
+        key: Key from response_cache_key
+        result: Result dictionary; failed extractions are not cached
+    """
+    if result.get("status") != "success":
+        return
+    if len(_response_cache) >= _response_cache_max_size:
+        _response_cache.pop(next(iter(_response_cache)))
+    _response_cache[key] = {**result, "deals": [dict(deal) for deal in result["deals"]]}
+
+
+def ensure_model_downloaded(client, model_id: str):
+    """
+    Pull a model before first use
+
+    Args:
+        client: Ollama client
+        model_id: Ollama model identifier
+    """
+    if not check_model_downloaded(model_id):
+        print(f"⬇️  Downloading {model_id} model (first time only)...")
+        print(f"This may take a few minutes depending on your connection...")
+        try:
+            client.pull(model_id)
+            invalidate_ollama_models_cache()
+        except Exception as pull_err:
+            print(f"Error pulling model {model_id}: {pull_err}")
+
+
+def build_extraction_result(response_text: str, model_id: str, prompt: str) -> Dict:
+    """
+    Turn a raw model reply into the extraction result dictionary
+
+    Args:
+        response_text: Text returned by the model
+        model_id: Ollama model identifier
+        prompt: Prompt the reply answers
+
+    Returns:
+        Dictionary with extracted deals and metadata
+    """
+    # Log the raw response for debugging
+    print(f"[DEBUG] Ollama raw response (first 500 chars): {response_text[:500]}")
+
+    # Try to parse JSON from response
+    deals = parse_json_from_response(response_text)
 
+    if not deals:
+        print(f"[DEBUG] Failed to parse JSON. Full response: {response_text}")
         return {
             "deals": [],
             "total_products": 0,
             "extraction_method": f"Ollama {model_id}",
             "status": "error",
-            "error": error_msg,
+            "error": "No valid products extracted",
             "raw_input": prompt,
-            "raw_response": f"Ollama Error: {error_msg}"
+            "raw_response": response_text
         }
 
+    # Calculate confidence based on completeness
+    avg_confidence = calculate_confidence(deals)
+
+    return {
+        "deals": deals,
+        "total_products": len(deals),
+        "average_confidence": avg_confidence,
+        "extraction_method": f"Ollama {model_id}",
+        "model_info": {
+            "model": model_id,
+            "provider": "Ollama (Local)"
+        },
+        "status": "success",
+        "raw_input": prompt,
+        "raw_response": response_text
+    }
+
+
+def build_error_result(error: Exception, model_id: str, prompt: str) -> Dict:
+    """
+    Build the result dictionary for a failed extraction
+
+    Args:
+        error: Exception raised by the request or the parsing
+        model_id: Ollama model identifier
+        prompt: Prompt that was sent
+
+    Returns:
+        Dictionary with no deals and the error message
+    """
+    error_msg = str(error)
+
+    # Provide helpful error messages
+    if "model" in error_msg.lower() and "not found" in error_msg.lower():
+        error_msg = f"Model {model_id} not found. Please ensure it is available in Ollama."
+
+    return {
+        "deals": [],
+        "total_products": 0,
+        "extraction_method": f"Ollama {model_id}",
+        "status": "error",
+        "error": error_msg,
+        "raw_input": prompt,
+        "raw_response": f"Ollama Error: {error_msg}"
+    }
+
+
+def _loads_json(text: str):
+    """json.loads, through orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN or Infinity literals, which only stdlib accepts
+    return json.loads(text)
+
 
 def parse_json_from_response(text: str) -> List[Dict]:
     """
@@ -293,18 +539,17 @@ def parse_json_from_response(text: str) -> List[Dict]:
     Returns:
         List of product dictionaries
     """
-    # Try to find JSON array in the response
-    import re
-
     # Remove markdown code blocks if present
-    text = re.sub(r'```json\s*', '', text)
-    text = re.sub(r'```\s*', '', text)
-
-    # Try to find JSON array
-    json_match = re.search(r'\[.*\]', text, re.DOTALL)
-    if json_match:
+    if '```' in text:
+        text = CODE_FENCE_RE.sub('', text)
+
+    # Try the span from the first '[' to the last ']' (two linear scans; a
+    # greedy regex re-scans the rest of the text for every unclosed '[')
+    start = text.find('[')
+    end = text.rfind(']')
+    if start != -1 and end > start:
         try:
-            deals = json.loads(json_match.group(0))
+            deals = _loads_json(text[start:end + 1])
             if isinstance(deals, list):
                 return deals
         except json.JSONDecodeError:
@@ -312,7 +557,7 @@ def parse_json_from_response(text: str) -> List[Dict]:
 
     # Try parsing the entire text
     try:
-        deals = json.loads(text)
+        deals = _loads_json(text)
         if isinstance(deals, list):
             return deals
     except json.JSONDecodeError:
@@ -383,6 +628,7 @@ def pull_model(model_id: str, progress_callback=None) -> bool:
 
         # Pull the model
         client.pull(model_id)
+        invalidate_ollama_models_cache()
 
         if progress_callback:
             progress_callback(f"✓ {model_id} downloaded successfully!")
@@ -410,6 +656,7 @@ def delete_model(model_id: str) -> bool:
         if not client:
             return False
         client.delete(model_id)
+        invalidate_ollama_models_cache()
         return True
     except Exception:
         return False
@@ -1,14 +1,23 @@
 """OCR pipeline for extracting text from brochure images"""
 
 import os
+import csv
 import json
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import cv2
 import numpy as np
-from PIL import Image
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -17,6 +26,164 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def write_json(data, output_file) -> None:
+    """
+    Write data as indented UTF-8 JSON, using orjson when it is installed
+
+    Args:
+        data: JSON-serializable data (numpy scalars/arrays allowed with orjson)
+        output_file: Path to output file
+    """
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# Header of the 'csv' output format, one row per text box
+CSV_COLUMNS = ('text', 'confidence', 'x_min', 'y_min', 'x_max', 'y_max')
+
+# Unfiltered OCR results kept per pipeline instance
+RESULT_CACHE_SIZE = 16
+
+# Fixed-size bbox record: 16 bytes per box instead of a 4-key dict
+BBOX_DTYPE = np.dtype([('x_min', 'i4'), ('y_min', 'i4'), ('x_max', 'i4'), ('y_max', 'i4')])
+
+# Longest image side handed to the OCR engine (~250 dpi for an A4 page); OCR
+# time grows with pixel count while accuracy stops improving past this
+OCR_MAX_LONG_EDGE = 3000
+
+
+def prepare_for_ocr(image: np.ndarray, max_long_edge: int = OCR_MAX_LONG_EDGE) -> Tuple[np.ndarray, float]:
+    """
+    Downscale an oversized image so its longest side is at most max_long_edge
+
+    Args:
+        image: Image array (BGR or grayscale)
+        max_long_edge: Maximum size of the longest side in pixels
+
+    Returns:
+        Tuple of (possibly resized image, scale factor applied; 1.0 if unchanged)
+    """
+    h, w = image.shape[:2]
+    long_edge = max(h, w)
+    if long_edge <= max_long_edge:
+        return image, 1.0
+
+    scale = max_long_edge / long_edge
+    new_size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(image, new_size, interpolation=cv2.INTER_AREA), scale
+
+
+def quads_to_bboxes(quads) -> np.ndarray:
+    """
+    Convert OCR quadrilaterals to axis-aligned boxes in one vectorized pass
+
+    Args:
+        quads: Sequence of N quads, each 4 (x, y) points
+
+    Returns:
+        int32 array of shape [N, 4] with (x_min, y_min, x_max, y_max) rows
+    """
+    pts = np.asarray(quads, dtype=np.float32).reshape(-1, 4, 2)
+    # int() truncation, as the per-point min()/max() version did
+    return np.concatenate([pts.min(axis=1), pts.max(axis=1)], axis=1).astype(np.int32)
+
+
+def _build_text_boxes(texts: List[str], confidences: List[float], bboxes: np.ndarray) -> List[Dict]:
+    """Assemble the legacy list-of-dicts text box format from parallel arrays"""
+    return [
+        {
+            'text': text,
+            'confidence': conf,
+            'bbox': {'x_min': x0, 'y_min': y0, 'x_max': x1, 'y_max': y1}
+        }
+        for text, conf, (x0, y0, x1, y1) in zip(texts, confidences, bboxes.tolist())
+    ]
+
+
+def _arrays_from_columns(texts: List[str], confidences: List[float], bboxes: np.ndarray) -> Dict[str, np.ndarray]:
+    """text_boxes_to_arrays() output built from the OCR columns, without the dicts"""
+    n = len(texts)
+    records = np.empty(n, dtype=BBOX_DTYPE)
+    if n:
+        for i, name in enumerate(BBOX_DTYPE.names):
+            records[name] = bboxes[:, i]
+    return {
+        'bboxes': records,
+        'texts': np.array(texts, dtype=object) if n else np.empty(0, dtype=object),
+        'confidences': np.asarray(confidences, dtype=np.float64)
+    }
+
+
+def text_boxes_to_arrays(text_boxes: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Convert text boxes to a struct-of-arrays layout for vectorized work
+
+    Args:
+        text_boxes: List of text box dicts (result['text_boxes'])
+
+    Returns:
+        Dictionary with 'bboxes' (BBOX_DTYPE records [N]), 'texts' and
+        'confidences' (float64 [N])
+    """
+    n = len(text_boxes)
+    bboxes = np.fromiter(
+        ((b['bbox']['x_min'], b['bbox']['y_min'], b['bbox']['x_max'], b['bbox']['y_max']) for b in text_boxes),
+        dtype=BBOX_DTYPE,
+        count=n
+    )
+    return {
+        'bboxes': bboxes,
+        'texts': np.array([b['text'] for b in text_boxes], dtype=object),
+        'confidences': np.fromiter((b['confidence'] for b in text_boxes), dtype=np.float64, count=n)
+    }
+
+
+def filter_text_boxes(result: Dict, min_confidence: float, confidences: Optional[np.ndarray] = None) -> Dict:
+    """
+    Drop text boxes below a confidence threshold using a vectorized mask
+
+    Args:
+        result: OCR result dictionary (as returned by process_image)
+        min_confidence: Minimum confidence (0-1) a box must have to be kept
+        confidences: Precomputed per-box confidence array (e.g. the
+            'confidences' of text_boxes_to_arrays()); built here if omitted
+
+    Returns:
+        New result dictionary with filtered 'text_boxes' and 'num_boxes';
+        the input result is left untouched
+    """
+    boxes = result.get('text_boxes', [])
+    if confidences is None:
+        confidences = np.fromiter((b['confidence'] for b in boxes), dtype=np.float32, count=len(boxes))
+    keep = np.flatnonzero(confidences >= min_confidence)
+
+    filtered = dict(result)
+    filtered['text_boxes'] = [boxes[i] for i in keep.tolist()]
+    filtered['num_boxes'] = int(keep.size)
+    return filtered
+
+
+def default_languages(ocr_engine: str) -> List[str]:
+    """
+    Default OCR languages for an engine
+
+    Args:
+        ocr_engine: OCR engine name (lowercase)
+
+    Returns:
+        Language codes in the engine's own naming scheme
+    """
+    if ocr_engine == 'tesseract':
+        # Tesseract uses 'eng', 'deu', etc.
+        return ['eng', 'deu']
+    # EasyOCR, PaddleOCR and others use 'en', 'de', etc.
+    return ['en', 'de']
+
+
 class OCRPipeline:
     """Pipeline for OCR processing of brochure images"""
 
@@ -31,29 +198,22 @@ class OCRPipeline:
 
         Args:
             ocr_engine: OCR engine to use ('paddleocr', 'tesseract', 'easyocr')
-            output_format: Output format ('json', 'txt', 'xml')
+            output_format: Output format ('json', 'txt', 'csv')
             languages: List of languages for OCR (default: engine-specific)
         """
         self.ocr_engine = ocr_engine.lower()
         self.output_format = output_format
 
         # Set default languages based on OCR engine
-        if languages is None:
-            if self.ocr_engine == 'tesseract':
-                # Tesseract uses 'eng', 'deu', etc.
-                self.languages = ['eng', 'deu']
-            elif self.ocr_engine == 'easyocr':
-                # EasyOCR uses 'en', 'de', etc.
-                self.languages = ['en', 'de']
-            else:
-                # PaddleOCR and others
-                self.languages = ['en', 'de']
-        else:
-            self.languages = languages
+        self.languages = languages if languages is not None else default_languages(self.ocr_engine)
 
         # Initialize OCR engine
         self.ocr = self._initialize_ocr()
 
+        # Unfiltered OCR results, so confidence threshold changes only re-filter
+        self._result_cache: "OrderedDict[tuple, Tuple[Dict, Dict[str, np.ndarray]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()  # process_batch shares the cache across threads
+
         logger.info(f"Initialized OCR pipeline with {self.ocr_engine} using languages: {self.languages}")
 
     def _initialize_ocr(self):
@@ -100,14 +260,26 @@ class OCRPipeline:
         Returns:
             Preprocessed image as numpy array
         """
-        # Read image
-        img = cv2.imread(image_path)
+        # Read image (decoded straight to grayscale, which is all preprocessing uses)
+        img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
 
         if img is None:
             raise ValueError(f"Could not read image: {image_path}")
 
+        return self.preprocess_array(img)
+
+    def preprocess_array(self, img: np.ndarray) -> np.ndarray:
+        """
+        Preprocess an in-memory image for better OCR results
+
+        Args:
+            img: BGR (or already grayscale) image array
+
+        Returns:
+            Preprocessed image as numpy array
+        """
         # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
 
         # Apply denoising
         denoised = cv2.fastNlMeansDenoising(gray)
@@ -134,26 +306,22 @@ class OCRPipeline:
         Returns:
             List of text boxes with coordinates and text
         """
+        return _build_text_boxes(*self._ocr_paddleocr(image))
+
+    def _ocr_paddleocr(self, image: np.ndarray) -> Tuple[List[str], List[float], np.ndarray]:
+        """PaddleOCR output as (texts, confidences, [N, 4] bboxes) columns"""
         result = self.ocr.ocr(image, cls=True)
 
-        extracted_data = []
-        if result and result[0]:
-            for line in result[0]:
-                box = line[0]  # Bounding box coordinates
-                text_info = line[1]  # (text, confidence)
-
-                extracted_data.append({
-                    'text': text_info[0],
-                    'confidence': float(text_info[1]),
-                    'bbox': {
-                        'x_min': int(min(p[0] for p in box)),
-                        'y_min': int(min(p[1] for p in box)),
-                        'x_max': int(max(p[0] for p in box)),
-                        'y_max': int(max(p[1] for p in box))
-                    }
-                })
-
-        return extracted_data
+        if not result or not result[0]:
+            return [], [], np.empty((0, 4), dtype=np.int32)
+
+        lines = result[0]
+        bboxes = quads_to_bboxes([line[0] for line in lines])  # Bounding box coordinates
+        return (
+            [line[1][0] for line in lines],  # (text, confidence)
+            [float(line[1][1]) for line in lines],
+            bboxes
+        )
 
     def extract_text_tesseract(self, image: np.ndarray) -> List[Dict]:
         """
@@ -165,6 +333,10 @@ class OCRPipeline:
         Returns:
             List of text boxes with coordinates and text
         """
+        return _build_text_boxes(*self._ocr_tesseract(image))
+
+    def _ocr_tesseract(self, image: np.ndarray) -> Tuple[List[str], List[float], np.ndarray]:
+        """Tesseract output as (texts, confidences, [N, 4] bboxes) columns"""
         import pytesseract
 
         # Get detailed data from Tesseract
@@ -174,25 +346,19 @@ class OCRPipeline:
             output_type=pytesseract.Output.DICT
         )
 
-        extracted_data = []
-        n_boxes = len(data['text'])
-
-        for i in range(n_boxes):
-            if int(data['conf'][i]) > 0:  # Filter out low confidence
-                text = data['text'][i].strip()
-                if text:
-                    extracted_data.append({
-                        'text': text,
-                        'confidence': float(data['conf'][i]) / 100.0,
-                        'bbox': {
-                            'x_min': data['left'][i],
-                            'y_min': data['top'][i],
-                            'x_max': data['left'][i] + data['width'][i],
-                            'y_max': data['top'][i] + data['height'][i]
-                        }
-                    })
-
-        return extracted_data
+        # Filter out low confidence / empty words with one vectorized mask
+        conf = np.asarray(data['conf'], dtype=np.float64)
+        texts = [t.strip() for t in data['text']]
+        has_text = np.fromiter((bool(t) for t in texts), dtype=bool, count=len(texts))
+        keep = np.flatnonzero((conf > 0) & has_text)
+
+        left = np.asarray(data['left'], dtype=np.int64)
+        top = np.asarray(data['top'], dtype=np.int64)
+        right = left + np.asarray(data['width'], dtype=np.int64)
+        bottom = top + np.asarray(data['height'], dtype=np.int64)
+        bboxes = np.stack([left, top, right, bottom], axis=1)[keep]
+
+        return [texts[i] for i in keep.tolist()], (conf[keep] / 100.0).tolist(), bboxes
 
     def extract_text_easyocr(self, image: np.ndarray) -> List[Dict]:
         """
@@ -204,54 +370,199 @@ class OCRPipeline:
         Returns:
             List of text boxes with coordinates and text
         """
-        result = self.ocr.readtext(image)
+        return _build_text_boxes(*self._ocr_easyocr(image))
 
-        extracted_data = []
-        for detection in result:
-            box, text, confidence = detection
+    def _ocr_easyocr(self, image: np.ndarray) -> Tuple[List[str], List[float], np.ndarray]:
+        """EasyOCR output as (texts, confidences, [N, 4] bboxes) columns"""
+        result = self.ocr.readtext(image)
 
-            extracted_data.append({
-                'text': text,
-                'confidence': float(confidence),
-                'bbox': {
-                    'x_min': int(min(p[0] for p in box)),
-                    'y_min': int(min(p[1] for p in box)),
-                    'x_max': int(max(p[0] for p in box)),
-                    'y_max': int(max(p[1] for p in box))
-                }
-            })
+        if not result:
+            return [], [], np.empty((0, 4), dtype=np.int32)
 
-        return extracted_data
+        bboxes = quads_to_bboxes([box for box, _, _ in result])
+        return (
+            [text for _, text, _ in result],
+            [float(confidence) for _, _, confidence in result],
+            bboxes
+        )
 
-    def process_image(self, image_path: str, preprocess: bool = True) -> Dict:
+    def process_image(self, image_path: str, preprocess: bool = True, min_confidence: float = 0.0) -> Dict:
         """
         Process a single image with OCR
 
         Args:
             image_path: Path to input image
             preprocess: Whether to preprocess the image
+            min_confidence: Drop text boxes below this confidence (0-1)
 
         Returns:
             Dictionary containing extracted data
         """
-        logger.info(f"Processing: {image_path}")
+        stat = os.stat(image_path)
+        key = ('file', os.path.abspath(image_path), stat.st_size, stat.st_mtime_ns, preprocess)
+        entry = self._get_cached_result(key)
 
-        # Load image
-        if preprocess:
-            image = self.preprocess_image(image_path)
-        else:
-            image = cv2.imread(image_path)
+        if entry is None:
+            logger.info(f"Processing: {image_path}")
+
+            # Load image; preprocessing only needs gray, so skip the 3-channel decode
+            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE if preprocess else cv2.IMREAD_COLOR)
+            if image is None:
+                raise ValueError(f"Could not read image: {image_path}")
 
-        # Extract text based on OCR engine
+            # Bound the pixel count before denoising/OCR, both scale with it
+            image, scale = prepare_for_ocr(image)
+            if preprocess:
+                image = self.preprocess_array(image)
+
+            entry = self._set_cached_result(key, *self._run_ocr(image, image_path, scale))
+
+        result, arrays = entry
+        return self._result_for_caller(result, arrays, min_confidence)
+
+    def process_array(
+        self,
+        image: np.ndarray,
+        preprocess: bool = True,
+        source: str = None,
+        min_confidence: float = 0.0
+    ) -> Dict:
+        """
+        Process an in-memory image with OCR, without a disk round-trip
+
+        Args:
+            image: BGR image array (e.g. cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)), or a
+                grayscale one when preprocess is True
+            preprocess: Whether to preprocess the image
+            source: Optional label stored as 'image_path' in the result
+            min_confidence: Drop text boxes below this confidence (0-1)
+
+        Returns:
+            Dictionary containing extracted data
+        """
+        if image is None or image.size == 0:
+            raise ValueError("Empty image array")
+
+        image = np.ascontiguousarray(image)
+        digest = hashlib.blake2b(memoryview(image).cast('B'), digest_size=16).hexdigest()
+        key = ('array', digest, image.shape, preprocess)
+        entry = self._get_cached_result(key)
+
+        if entry is None:
+            image, scale = prepare_for_ocr(image)
+            if preprocess:
+                image = self.preprocess_array(image)
+
+            entry = self._set_cached_result(key, *self._run_ocr(image, source, scale))
+
+        result, arrays = entry
+        if result.get('image_path') != source:
+            result = dict(result, image_path=source)
+
+        return self._result_for_caller(result, arrays, min_confidence)
+
+    def process_batch(
+        self,
+        images: List[np.ndarray],
+        preprocess: bool = True,
+        sources: List[str] = None,
+        min_confidence: float = 0.0,
+        max_workers: int = 4
+    ) -> List[Dict]:
+        """
+        Process several in-memory images (e.g. all pages of a PDF) in one call
+
+        Tesseract runs as a separate process per image, so pages are OCR'd
+        concurrently in a thread pool; PaddleOCR/EasyOCR models are not safe to
+        share across threads and run sequentially.
+
+        Args:
+            images: BGR image arrays
+            preprocess: Whether to preprocess the images
+            sources: Optional per-image labels stored as 'image_path'
+            min_confidence: Drop text boxes below this confidence (0-1)
+            max_workers: Maximum concurrent Tesseract processes
+
+        Returns:
+            List of result dictionaries, in input order
+        """
+        if sources is None:
+            sources = [None] * len(images)
+
+        def _process(args):
+            image, source = args
+            return self.process_array(image, preprocess, source, min_confidence)
+
+        if self.ocr_engine != 'tesseract' or len(images) < 2:
+            return [_process(args) for args in zip(images, sources)]
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(images))) as executor:
+            return list(executor.map(_process, zip(images, sources)))
+
+    @staticmethod
+    def _result_for_caller(result: Dict, arrays: Dict[str, np.ndarray], min_confidence: float) -> Dict:
+        """Filtered copy of a cached result whose text boxes the caller may mutate"""
+        if min_confidence > 0:
+            result = filter_text_boxes(result, min_confidence, arrays['confidences'])
+        copy = dict(result)
+        copy['text_boxes'] = [{**box, 'bbox': dict(box['bbox'])} for box in result['text_boxes']]
+        return copy
+
+    def _get_cached_result(self, key: tuple) -> Optional[Tuple[Dict, Dict[str, np.ndarray]]]:
+        """Look up an unfiltered OCR result (and its arrays), marking it most recently used"""
+        with self._cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is not None:
+                self._result_cache.move_to_end(key)
+        if entry is not None:
+            logger.info("OCR cache hit, re-filtering cached text boxes")
+        return entry
+
+    def _set_cached_result(
+        self,
+        key: tuple,
+        result: Dict,
+        arrays: Optional[Dict[str, np.ndarray]] = None
+    ) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """Store an unfiltered OCR result, evicting the least recently used
+
+        The struct-of-arrays view is kept alongside (built here if not
+        given), so each later threshold change is a single mask over the
+        cached confidences.
+        """
+        if arrays is None:
+            arrays = text_boxes_to_arrays(result['text_boxes'])
+        entry = (result, arrays)
+        with self._cache_lock:
+            self._result_cache[key] = entry
+            if len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return entry
+
+    def _run_ocr(
+        self,
+        image: np.ndarray,
+        image_path: Optional[str],
+        scale: float = 1.0
+    ) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """Run the configured OCR engine; returns the result dict and its struct-of-arrays view"""
+        # Extract text based on OCR engine, as columns with an [N, 4] bbox array
         if self.ocr_engine == 'paddleocr':
-            text_data = self.extract_text_paddleocr(image)
+            texts, confidences, bboxes = self._ocr_paddleocr(image)
         elif self.ocr_engine == 'tesseract':
-            text_data = self.extract_text_tesseract(image)
+            texts, confidences, bboxes = self._ocr_tesseract(image)
         elif self.ocr_engine == 'easyocr':
-            text_data = self.extract_text_easyocr(image)
+            texts, confidences, bboxes = self._ocr_easyocr(image)
         else:
             raise ValueError(f"Unsupported OCR engine: {self.ocr_engine}")
 
+        # Map boxes back to the coordinates of the original (un-downscaled)
+        # image in one array op (rint rounds half to even, like round())
+        if scale != 1.0:
+            bboxes = np.rint(bboxes * (1.0 / scale)).astype(np.int64)
+
+        text_data = _build_text_boxes(texts, confidences, bboxes)
         result = {
             'image_path': image_path,
             'ocr_engine': self.ocr_engine,
@@ -260,7 +571,7 @@ class OCRPipeline:
         }
 
         logger.info(f"Extracted {len(text_data)} text boxes")
-        return result
+        return result, _arrays_from_columns(texts, confidences, bboxes)
 
     def save_results(self, results: Dict, output_path: str):
         """
@@ -274,13 +585,22 @@ class OCRPipeline:
         output_file.parent.mkdir(parents=True, exist_ok=True)
 
         if self.output_format == 'json':
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+            write_json(results, output_file)
 
         elif self.output_format == 'txt':
             with open(output_file, 'w', encoding='utf-8') as f:
-                for box in results['text_boxes']:
-                    f.write(f"{box['text']}\n")
+                f.writelines(f"{box['text']}\n" for box in results['text_boxes'])
+
+        elif self.output_format == 'csv':
+            # Flat rows straight from the box dicts, no DataFrame round-trip
+            with open(output_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(CSV_COLUMNS)
+                writer.writerows(
+                    (box['text'], box['confidence'], box['bbox']['x_min'], box['bbox']['y_min'],
+                     box['bbox']['x_max'], box['bbox']['y_max'])
+                    for box in results['text_boxes']
+                )
 
         logger.info(f"Results saved to: {output_path}")
 
@@ -318,25 +638,77 @@ class OCRPipeline:
 
         for image_file in image_files:
             try:
-                result = self.process_image(str(image_file))
-                results.append(result)
-
-                # Save individual result
-                output_file = output_path / f"{image_file.stem}.json"
-                self.save_results(result, str(output_file))
+                if image_file.suffix.lower() == '.pdf':
+                    # All pages in one batch call; one result file per page
+                    try:
+                        from preprocessing.pdf_processor import convert_pdf_to_images
+                    except ImportError:  # run as a script from this directory
+                        from pdf_processor import convert_pdf_to_images
+                    # Pages are preprocessed, so go RGB -> gray in one pass instead of via BGR
+                    pages = [cv2.cvtColor(page, cv2.COLOR_RGB2GRAY) for page in convert_pdf_to_images(str(image_file))]
+                    sources = [f"{image_file}#page={i}" for i in range(1, len(pages) + 1)]
+                    page_results = self.process_batch(pages, sources=sources)
+                    output_files = [output_path / f"{image_file.stem}_page_{i}.json" for i in range(1, len(pages) + 1)]
+                else:
+                    page_results = [self.process_image(str(image_file))]
+                    output_files = [output_path / f"{image_file.stem}.json"]
+
+                for result, output_file in zip(page_results, output_files):
+                    results.append(result)
+
+                    # Save individual result
+                    self.save_results(result, str(output_file))
 
             except Exception as e:
                 logger.error(f"Error processing {image_file}: {e}")
 
         # Save combined results
         combined_output = output_path / "all_results.json"
-        with open(combined_output, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+        write_json(results, combined_output)
 
         logger.info(f"Processed {len(results)} images")
         return results
 
 
+# Serializes first construction so concurrent requests load each engine once
+_pipeline_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _cached_pipeline(ocr_engine: str, output_format: str, languages: Tuple[str, ...]) -> OCRPipeline:
+    return OCRPipeline(
+        ocr_engine=ocr_engine,
+        output_format=output_format,
+        languages=list(languages)
+    )
+
+
+def get_pipeline(
+    ocr_engine: str = 'paddleocr',
+    output_format: str = 'json',
+    languages: List[str] = None
+) -> OCRPipeline:
+    """
+    Get a shared OCR pipeline, creating it on first use
+
+    Engine construction loads model weights (PaddleOCR/EasyOCR), so callers
+    processing more than one image should use this instead of OCRPipeline().
+
+    Args:
+        ocr_engine: OCR engine to use ('paddleocr', 'tesseract', 'easyocr')
+        output_format: Output format ('json', 'txt', 'csv')
+        languages: List of languages for OCR (default: engine-specific)
+
+    Returns:
+        Cached OCRPipeline instance for these settings
+    """
+    ocr_engine = ocr_engine.lower()
+    # Resolve defaults first so implicit and explicit default languages share an instance
+    key = (ocr_engine, output_format, tuple(languages if languages is not None else default_languages(ocr_engine)))
+    with _pipeline_lock:
+        return _cached_pipeline(*key)
+
+
 def main():
     """Main entry point for OCR pipeline"""
     import argparse
@@ -345,12 +717,12 @@ def main():
     parser.add_argument('--input', required=True, help='Input directory or file')
     parser.add_argument('--output', required=True, help='Output directory')
     parser.add_argument('--engine', default='paddleocr', choices=['paddleocr', 'tesseract', 'easyocr'])
-    parser.add_argument('--format', default='json', choices=['json', 'txt'])
+    parser.add_argument('--format', default='json', choices=['json', 'txt', 'csv'])
     parser.add_argument('--no-preprocess', action='store_true', help='Disable preprocessing')
 
     args = parser.parse_args()
 
-    pipeline = OCRPipeline(ocr_engine=args.engine, output_format=args.format)
+    pipeline = get_pipeline(ocr_engine=args.engine, output_format=args.format)
 
     input_path = Path(args.input)
     if input_path.is_dir():
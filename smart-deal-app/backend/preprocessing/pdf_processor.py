@@ -14,6 +14,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Longest side (pixels) of first-page previews; the browser shows them smaller
+PREVIEW_LONG_EDGE = 1200
+
 
 class PDFProcessor:
     """Process PDF files and convert to images for OCR"""
@@ -127,8 +130,9 @@ class PDFProcessor:
             # Convert to PIL Image
             pil_image = bitmap.to_pil()
 
-            # Convert to numpy array
-            img_array = np.array(pil_image)
+            # Convert to numpy array (np.asarray skips np.array's second copy;
+            # the result is read-only, callers must copy before drawing on it)
+            img_array = np.asarray(pil_image)
 
             images.append(img_array)
 
@@ -185,8 +189,8 @@ class PDFProcessor:
         else:
             pil_images = convert_from_path(pdf_path, dpi=self.dpi)
 
-        # Convert to numpy arrays
-        images = [np.array(img) for img in pil_images]
+        # Convert to numpy arrays (read-only, see pdf_to_images_pypdfium2)
+        images = [np.asarray(img) for img in pil_images]
 
         # Save if output directory specified
         if output_dir:
@@ -242,16 +246,40 @@ class PDFProcessor:
 
         return []
 
-    def get_first_page_image(self, pdf_path: str) -> np.ndarray:
+    def get_first_page_image(self, pdf_path: str, max_long_edge: Optional[int] = PREVIEW_LONG_EDGE) -> np.ndarray:
         """
         Get first page of PDF as image (for preview)
 
+        The page is rendered directly at preview size instead of rendering at
+        full DPI and downscaling, so no full-resolution buffer is allocated.
+
         Args:
             pdf_path: Path to PDF file
+            max_long_edge: Longest side of the preview in pixels (never above
+                the configured DPI); None renders at full resolution
 
         Returns:
             First page as numpy array
         """
+        if max_long_edge and self.pdf_lib == 'pypdfium2':
+            if not Path(pdf_path).exists():
+                raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+            pdf = self.pypdfium2.PdfDocument(str(pdf_path))
+            if len(pdf) == 0:
+                return None
+            page = pdf[0]
+            width, height = page.get_size()
+            scale = min(self.dpi / 72, max_long_edge / max(width, height))
+            return np.asarray(page.render(scale=scale, rotation=0).to_pil())
+
+        if max_long_edge and self.pdf_lib == 'pdf2image':
+            if not Path(pdf_path).exists():
+                raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+            from pdf2image import convert_from_path
+            # An int size makes pdftoppm scale the long side to fit
+            pages = convert_from_path(str(pdf_path), dpi=self.dpi, first_page=1, last_page=1, size=max_long_edge)
+            return np.asarray(pages[0]) if pages else None
+
         images = self.pdf_to_images(pdf_path, page_numbers=[1])
         return images[0] if images else None
 
@@ -366,10 +394,20 @@ def main():
 
 
 
+# Shared default-settings processor (the PDF library lookup runs once)
+_processor_instance: Optional[PDFProcessor] = None
+
+def get_pdf_processor() -> PDFProcessor:
+    """Get the shared PDFProcessor instance with default settings"""
+    global _processor_instance
+    if _processor_instance is None:
+        _processor_instance = PDFProcessor()
+    return _processor_instance
+
+
 def convert_pdf_to_images(pdf_path: str) -> List[np.ndarray]:
     """Helper function to convert PDF to images using default settings"""
-    processor = PDFProcessor()
-    return processor.pdf_to_images(pdf_path)
+    return get_pdf_processor().pdf_to_images(pdf_path)
 
 if __name__ == '__main__':
     import sys
@@ -2,12 +2,15 @@
 Professional Admin API - Batch processing, statistics, and method comparison.
 """
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, BackgroundTasks
-from typing import List, Optional
+from fastapi.responses import ORJSONResponse
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 from enum import Enum
 import os
 import uuid
+import shutil
 import asyncio
+from collections import Counter
 from datetime import datetime
 
 from services.model_router import (
@@ -27,6 +30,16 @@ router = APIRouter(prefix="/api/admin", tags=["admin-pro"])
 processing_queue: List[dict] = []
 processing_results: dict = {}
 
+# Uploads are streamed to disk in chunks of this size rather than read whole
+UPLOAD_COPY_BUFFER = 1 << 20
+
+async def save_upload_file(file: UploadFile, path: str):
+    """Stream an uploaded file to disk without holding it all in memory"""
+    def _copy():
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(file.file, f, UPLOAD_COPY_BUFFER)
+    await asyncio.to_thread(_copy)
+
 class BatchJobStatus(str, Enum):
     PENDING = "pending"
     PROCESSING = "processing"
@@ -45,28 +58,17 @@ class ComparisonRequest(BaseModel):
 @router.get("/stats")
 async def get_admin_stats():
     """Get comprehensive statistics for dashboard"""
-    deals_data = storage.get_active_deals()
-    deals = deals_data.get("deals", [])
-    
-    # Basic stats
+    # Basic stats; the store / category breakdown is computed once per
+    # active-deals cache fill instead of on every dashboard refresh
+    breakdown = storage.get_active_deals_breakdown()
     stats = {
-        "total_deals": len(deals),
-        "stores": {},
-        "categories": {},
+        "total_deals": breakdown["total_deals"],
+        "stores": breakdown["stores"],
+        "categories": breakdown["categories"],
         "weekly_extractions": 0,
         "usage": get_usage_stats(7)
     }
     
-    # Group by store
-    for deal in deals:
-        store = deal.get("store", "Unknown")
-        stats["stores"][store] = stats["stores"].get(store, 0) + 1
-    
-    # Group by category
-    for deal in deals:
-        cat = deal.get("category", "Other")
-        stats["categories"][cat] = stats["categories"].get(cat, 0) + 1
-    
     # Weekly extractions from usage logs
     stats["weekly_extractions"] = stats["usage"].get("total_extractions", 0)
     
@@ -80,7 +82,7 @@ async def get_usage_details(days: int = 7):
 @router.get("/usage/logs")
 async def get_usage_log_entries(limit: int = 100):
     """Get raw usage log entries"""
-    return {"logs": usage_logs[-limit:]}
+    return {"logs": list(usage_logs)[-limit:]}
 
 # === Batch Processing ===
 
@@ -101,9 +103,7 @@ async def batch_upload(
         
         # Save file temporarily
         temp_path = f"/tmp/batch_{job_id}_{file.filename}"
-        content = await file.read()
-        with open(temp_path, 'wb') as f:
-            f.write(content)
+        await save_upload_file(file, temp_path)
         
         job = {
             "id": job_id,
@@ -159,10 +159,14 @@ async def process_batch(batch_id: str):
             upload_id = None
             try:
                 import hashlib
-                with open(job["file_path"], "rb") as f:
-                    file_hash = hashlib.md5(f.read()).hexdigest()
+                def _md5(path):
+                    with open(path, "rb") as f:
+                        return hashlib.md5(f.read()).hexdigest()
+                # Runs as a background task on the event loop: keep blocking work in threads
+                file_hash = await asyncio.to_thread(_md5, job["file_path"])
                 
-                upload_id = storage.log_upload(
+                upload_id = await asyncio.to_thread(
+                    storage.log_upload,
                     filename=job["file_name"],
                     deal_count=len(result["deals"]),
                     file_path=job["file_path"],  # Note: this is temp path
@@ -172,9 +176,12 @@ async def process_batch(batch_id: str):
             except Exception as ex:
                 print(f"Failed to log upload: {ex}")
 
-            # 2. Add deals to storage LINKED to upload_id
+            # 2. Add deals to storage LINKED to upload_id (one batched insert per store)
+            deals_by_store = {}
             for deal in result["deals"]:
-                storage.add_deal(deal, upload_id=upload_id)
+                deals_by_store.setdefault(deal.get('store', 'Unknown'), []).append(deal)
+            for store_name, store_deals in deals_by_store.items():
+                await asyncio.to_thread(storage.save_active_deals, store_deals, store_name=store_name, upload_id=upload_id)
                 
         except Exception as e:
             job["status"] = BatchJobStatus.FAILED
@@ -212,7 +219,7 @@ async def delete_deals_batch(ids: List[int]):
         raise HTTPException(400, "Failed to delete deals")
     return {"status": "deleted", "count": len(ids)}
 
-@router.get("/deals")
+@router.get("/deals", response_class=ORJSONResponse)
 async def search_deals(q: str = "", page: int = 1, limit: int = 50):
     """Search deals with pagination"""
     return storage.search_deals(q, page, limit)
@@ -238,8 +245,9 @@ async def get_batch_status(batch_id: str):
     if not jobs:
         raise HTTPException(404, "Batch not found")
     
-    completed = sum(1 for j in jobs if j["status"] == BatchJobStatus.COMPLETED)
-    failed = sum(1 for j in jobs if j["status"] == BatchJobStatus.FAILED)
+    counts = Counter(j["status"] for j in jobs)
+    completed = counts[BatchJobStatus.COMPLETED]
+    failed = counts[BatchJobStatus.FAILED]
     
     return {
         "batch_id": batch_id,
@@ -253,12 +261,14 @@ async def get_batch_status(batch_id: str):
 @router.get("/queue")
 async def get_queue_status():
     """Get all processing queue items"""
+    # One pass over the queue for all four status counts
+    counts = Counter(j["status"] for j in processing_queue)
     return {
         "total": len(processing_queue),
-        "pending": sum(1 for j in processing_queue if j["status"] == BatchJobStatus.PENDING),
-        "processing": sum(1 for j in processing_queue if j["status"] == BatchJobStatus.PROCESSING),
-        "completed": sum(1 for j in processing_queue if j["status"] == BatchJobStatus.COMPLETED),
-        "failed": sum(1 for j in processing_queue if j["status"] == BatchJobStatus.FAILED),
+        "pending": counts[BatchJobStatus.PENDING],
+        "processing": counts[BatchJobStatus.PROCESSING],
+        "completed": counts[BatchJobStatus.COMPLETED],
+        "failed": counts[BatchJobStatus.FAILED],
         "recent": processing_queue[-10:]
     }
 
@@ -272,18 +282,13 @@ async def compare_methods(
 ):
     """Run extraction with all methods and compare results"""
     # Save file
-    temp_path = f"/tmp/compare_{uuid.uuid4()[:8]}_{file.filename}"
-    content = await file.read()
-    with open(temp_path, 'wb') as f:
-        f.write(content)
-    
-    results = {}
+    temp_path = f"/tmp/compare_{uuid.uuid4().hex[:8]}_{file.filename}"
+    await save_upload_file(file, temp_path)
     
-    # Try each method
-    for method in ExtractionMethod:
+    async def run_method(method: ExtractionMethod) -> Dict:
         try:
             result = await extract_deals(temp_path, store_name, method, model_id=ollama_model)
-            results[method.value] = {
+            return {
                 "success": True,
                 "deal_count": len(result["deals"]),
                 "duration_ms": result["duration_ms"],
@@ -292,13 +297,18 @@ async def compare_methods(
                 "raw_response": result.get("raw_response")
             }
         except Exception as e:
-            results[method.value] = {
+            return {
                 "success": False,
                 "error": str(e),
                 "deal_count": 0,
                 "duration_ms": 0
             }
     
+    # Run all methods concurrently; wall time is the slowest method, not the sum
+    methods = list(ExtractionMethod)
+    outcomes = await asyncio.gather(*(run_method(method) for method in methods))
+    results = {method.value: outcome for method, outcome in zip(methods, outcomes)}
+    
     # Cleanup
     try:
         os.remove(temp_path)
@@ -329,21 +339,21 @@ async def compare_methods(
 # === Settings ===
 
 @router.get("/config")
-async def get_config():
-    """Get admin configuration"""
+async def get_config(refresh: bool = False):
+    """Get admin configuration (refresh=true re-queries the local Ollama service)"""
     from services.storage import get_ai_token
     from services.gemini_models import get_available_models
     from extractors.ollama_extractor import check_ollama_available, get_available_ollama_models
     
     api_key = get_ai_token()
-    ollama_ok = check_ollama_available()
+    ollama_ok = check_ollama_available(refresh=refresh)
     
     return {
         "gemini_configured": bool(api_key),
         "gemini_key_masked": f"***{api_key[-4:]}" if api_key else None,
         "local_vlm_endpoint": "http://localhost:11434",
         "local_vlm_available": ollama_ok,
-        "local_vlm_models": get_available_ollama_models() if ollama_ok else [],
+        "local_vlm_models": get_available_ollama_models(refresh=refresh) if ollama_ok else [],
         "ocr_available": True,
         "methods_available": [m.value for m in ExtractionMethod],
         "gemini_models": get_available_models()
@@ -381,9 +391,7 @@ async def compare_gemini_models_endpoint(
     
     # Save file temporarily
     temp_path = f"/tmp/gemini_compare_{str(uuid.uuid4())[:8]}_{file.filename}"
-    content = await file.read()
-    with open(temp_path, 'wb') as f:
-        f.write(content)
+    await save_upload_file(file, temp_path)
     
     try:
         model_list = [m.strip() for m in models.split(",") if m.strip()]
@@ -424,9 +432,7 @@ async def test_feature(
     """Test a feature with a specific file"""
     # Save temp
     temp_path = f"/tmp/feat_{str(uuid.uuid4())[:8]}_{file.filename}"
-    content = await file.read()
-    with open(temp_path, 'wb') as f:
-        f.write(content)
+    await save_upload_file(file, temp_path)
         
     try:
         result = await feature_router.process_feature(
@@ -512,7 +518,7 @@ async def get_uploads(limit: int = 50, offset: int = 0):
         "offset": offset
     }
 
-@router.get("/uploads/{upload_id}/deals")
+@router.get("/uploads/{upload_id}/deals", response_class=ORJSONResponse)
 async def get_upload_deals(upload_id: int):
     """Get all deals for a specific upload"""
     # Verify upload exists
@@ -536,7 +542,7 @@ async def delete_upload(upload_id: int):
     
     # Delete (ON DELETE CASCADE in schema handles deals)
     try:
-        db.execute_query("DELETE FROM uploads WHERE id = %s", (upload_id,))
+        storage.delete_upload(upload_id)
         return {"status": "deleted", "id": upload_id}
     except Exception as e:
         raise HTTPException(500, f"Deletion failed: {str(e)}")
@@ -554,6 +560,7 @@ async def clear_synthetic_data():
     """Delete all synthetic deals"""
     try:
         db.execute_query("DELETE FROM deals WHERE source = 'mock_generator'")
+        storage.invalidate_deals_cache()
         return {"status": "deleted", "message": "Synthetic data cleared"}
     except Exception as e:
         raise HTTPException(500, f"Cleanup failed: {str(e)}")
@@ -5,7 +5,7 @@ Includes: daily briefing, fridge scan, and agentic recommendations.
 from fastapi import APIRouter, HTTPException, UploadFile, File, Body
 from pydantic import BaseModel
 from typing import List
-from services import storage, mock_generator
+from services import storage
 from services.ai_client import get_ai_client
 import os
 import random
@@ -35,6 +35,7 @@ def update_preferences(prefs: Preferences):
 @router.post("/generate-mock")
 def generate_mock_data():
     """Generates 2000 mock deals"""
+    from services import mock_generator  # Pulls in numpy; keep it off the startup path
     result = mock_generator.generate_mock_deals(2000)
     return {"status": "ok", "generated": len(result)}
 
@@ -132,6 +133,7 @@ async def get_agentic_recommendations(req: RecommendRequest):
     """Agentic Recommendation Engine with unified AI client."""
     client = get_ai_client()
     
+    all_deals = []
     try:
         # 1. Gather ALL context
         shopping_list = req.shopping_list or storage.get_shopping_list()
@@ -145,10 +147,10 @@ async def get_agentic_recommendations(req: RecommendRequest):
             return {"recommendations": [], "reasoning": "No deals available.", "agent_mode": True}
         
         # 2. Build Agent Prompt
-        deals_summary = "\n".join([
+        deals_summary = "\n".join(
             f"- ID:{i} | {d['product_name']} | €{d['price']} | {d['store']} | {d.get('category', 'Other')}"
             for i, d in enumerate(all_deals)
-        ])
+        )
         
         prompt = f"""You are a smart Shopping Agent. Recommend the BEST deals for this user.
 
@@ -201,8 +203,8 @@ Use tags: [List], [Watch], [Deal], [Fresh], [Popular]
             
     except Exception as e:
         print(f"Agent Recommend Error: {e}")
-        deals_data = storage.get_active_deals()
-        all_deals = deals_data.get("deals", [])
+        if not all_deals:
+            all_deals = storage.get_active_deals().get("deals", [])
         return {
             "recommendations": random.sample(all_deals, min(req.limit, len(all_deals))) if all_deals else [],
             "reasoning": f"Error: {str(e)}",
@@ -10,14 +10,42 @@ import os
 import json
 import re
 import asyncio
+from itertools import islice
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
 # Simple Chef Persona
 CHEF_SYSTEM = """You are a friendly AI Chef. Help users save money and cook well.
 Return JSON: {"response": "your message", "recipes": [{"name": "...", "ingredients": [...], "instructions": "..."}]}
 Keep responses SHORT and helpful. Max 2-3 sentences unless asked for details."""
 
+# Knowledge base snippets, re-read only when the notes they come from change
+_knowledge_base_cache: dict = {}
+
+
+def _knowledge_base_snippets() -> list:
+    """First 1000 chars of up to 3 knowledge base notes, cached per file stat"""
+    kb_dir = os.path.join(os.getcwd(), "knowledge_base")
+    try:
+        with os.scandir(kb_dir) as entries:
+            notes = [entry for entry in islice(entries, 3) if entry.name.endswith(".md")]
+            # Keyed on the files themselves: editing a note in place does not
+            # change the directory's mtime
+            signature = tuple((n.name, n.stat().st_mtime_ns, n.stat().st_size) for n in notes)
+    except OSError:
+        return []
+    cached = _knowledge_base_cache.get(kb_dir)
+    if cached is None or cached[0] != signature:
+        snippets = []
+        for note in notes:
+            with open(note.path) as fp:
+                content = fp.read(1000)
+            snippets.append(f"[{note.name}]: {content}")
+        cached = _knowledge_base_cache[kb_dir] = (signature, snippets)
+    return cached[1]
+
 
 @router.post("/")
 @router.post("")
@@ -51,20 +79,16 @@ async def chat_with_chef(message: dict = Body(...)):
             context_data.append(f"Shopping list: {', '.join(shopping_list[:10])}")
         
         if context.get("include_deals", True):
-            deals = get_active_deals().get("deals", [])[:15]
-            if deals:
-                deal_str = ", ".join([f"{d['product_name']} €{d['price']}" for d in deals])
+            deal_str = ", ".join(
+                f"{d['product_name']} €{d['price']}"
+                for d in islice(get_active_deals().get("deals", []), 15)
+            )
+            if deal_str:
                 context_data.append(f"Current deals: {deal_str}")
         
         # Knowledge base
         if context.get("include_knowledge"):
-            kb_dir = os.path.join(os.getcwd(), "knowledge_base")
-            if os.path.exists(kb_dir):
-                for f in os.listdir(kb_dir)[:3]:
-                    if f.endswith(".md"):
-                        with open(os.path.join(kb_dir, f)) as fp:
-                            content = fp.read()[:1000]
-                            context_data.append(f"[{f}]: {content}")
+            context_data.extend(_knowledge_base_snippets())
         
         if context_data:
             prompt_parts.append("Context: " + " | ".join(context_data))
@@ -91,7 +115,7 @@ async def chat_with_chef(message: dict = Body(...)):
         text = response.content
         
         # Parse JSON response
-        json_match = re.search(r'\{.*\}', text, re.DOTALL)
+        json_match = JSON_OBJECT_RE.search(text)
         if json_match:
             try:
                 return json.loads(json_match.group())
@@ -1,14 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from services import storage
-from services.history import PriceHistoryService
-from services.chef import ChefService
+from services.history import get_history_service
+from services.chef import get_chef_service
+from services.ai_client import get_ai_client
 from middleware.auth import get_current_user
 
 router = APIRouter()
-history_service = PriceHistoryService()
-chef_service = ChefService()
 
 # --- Models ---
 class ShoppingItem(BaseModel):
@@ -25,14 +25,15 @@ class ChatRequest(BaseModel):
 
 # --- Endpoints ---
 
-@router.get("/deals/active")
+@router.get("/deals/active", response_class=ORJSONResponse)
 def get_active_deals(user = Depends(get_current_user)):
-    return storage.get_active_deals()
+    # Body is encoded once per deals-cache refresh, not on every request
+    return Response(content=storage.get_active_deals_json(), media_type="application/json")
 
-@router.get("/deals/history")
+@router.get("/deals/history", response_class=ORJSONResponse)
 def get_deal_history():
     # Return weekly best buys as summary
-    return history_service.get_weekly_best_buys()
+    return get_history_service().get_weekly_best_buys()
 
 @router.get("/shopping-list", response_model=List[str])
 def get_shopping_list():
@@ -70,7 +71,7 @@ def get_api_key_status():
 @router.post("/settings/key")
 def set_api_key(req: ApiKeyRequest):
     storage.save_api_key(req.api_key)
-    storage.save_api_key(req.api_key)
+    get_ai_client().reset_api_key()
     return {"status": "saved"}
 
 @router.post("/settings/reset")
@@ -90,13 +91,13 @@ def load_demo_data():
 
 @router.post("/chat")
 def chat_with_chef(req: ChatRequest):
-    active_deals = storage.get_active_deals()
-    
     # Simple intent recognition
     msg = req.message.lower()
     
     if "menu" in msg or "suggest" in msg or "dinner" in msg:
-        result = chef_service.suggest_menu_from_deals(active_deals)
+        # Only the menu intent needs the deal list, so fetch it lazily here
+        active_deals = storage.get_active_deals()["deals"]
+        result = get_chef_service().suggest_menu_from_deals(active_deals)
         return {"type": "menu", "data": result}
         
     elif "recipe" in msg:
@@ -104,7 +105,7 @@ def chat_with_chef(req: ChatRequest):
         dish_name = msg.split("recipe")[-1].replace("for", "").strip()
         if not dish_name:
             dish_name = "something delicious"
-        result = chef_service.generate_recipe_steps(dish_name)
+        result = get_chef_service().generate_recipe_steps(dish_name)
         return {"type": "recipe", "data": result}
 
     elif "cook" in msg or "make" in msg or "plan" in msg:
@@ -115,7 +116,7 @@ def chat_with_chef(req: ChatRequest):
         if not dish_name:
              dish_name = "dinner"
         
-        result = chef_service.plan_meal(dish_name)
+        result = get_chef_service().plan_meal(dish_name)
         return {"type": "meal_plan", "data": result}
         
     else:
@@ -6,46 +6,12 @@ from fastapi import APIRouter, HTTPException, Body
 from typing import List, Dict, Optional
 from pydantic import BaseModel
 from services import storage
-from services.rag_service import find_product_matches
+from services.category_classifier import guess_category
+from services.rag_service import find_best_product_match
 import math
-import re
 
 router = APIRouter(prefix="/api/route", tags=["route"])
 
-# Category keywords (same as shopping.py)
-CATEGORY_KEYWORDS = {
-    "Fruit & Veg": ["apple", "banana", "orange", "tomato", "potato", "carrot", "onion", "lettuce", "cucumber", "pepper", "lemon", "avocado", "spinach", "broccoli", "fruit", "vegetable", "salad", "berry"],
-    "Meat & Fish": ["chicken", "beef", "pork", "fish", "salmon", "tuna", "sausage", "bacon", "ham", "meat", "steak", "ground", "fillet", "shrimp"],
-    "Dairy": ["milk", "cheese", "yogurt", "butter", "cream", "egg", "eggs", "dairy", "joghurt"],
-    "Bakery": ["bread", "roll", "bun", "croissant", "cake", "pastry", "bagel", "toast"],
-    "Drinks": ["water", "juice", "cola", "soda", "beer", "wine", "coffee", "tea", "drink", "beverage"],
-    "Snacks": ["chips", "chocolate", "candy", "cookie", "biscuit", "nuts", "snack", "ice cream"],
-    "Household": ["soap", "detergent", "paper", "tissue", "cleaner", "shampoo", "toothpaste"]
-}
-
-def guess_category(item: str) -> str:
-    item_lower = item.lower()
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for kw in keywords:
-            if kw in item_lower:
-                return category
-    return "Other"
-
-def parse_unit_price(deal: Dict) -> float:
-    try:
-        price = float(deal.get('price', 0))
-        unit = deal.get('unit', '').lower()
-        if 'kg' in unit:
-            return price
-        elif 'g' in unit:
-            match = re.search(r'(\d+)\s*g', unit)
-            if match:
-                grams = int(match.group(1))
-                return (price / grams) * 1000
-        return price
-    except:
-        return 999.0
-
 class StoreLocation(BaseModel):
     name: str
     type: Optional[str] = "Supermarket"
@@ -129,10 +95,9 @@ async def plan_route(request: RoutePlanRequest):
         total_price = 0.0
         
         for item in items:
-            product_matches = find_product_matches(item, deals, threshold=0.6)
+            best = find_best_product_match(item, deals, threshold=0.6)
             
-            if product_matches:
-                best = product_matches[0]
+            if best:
                 price = float(best.get('price', 0))
                 matches.append({
                     "item": item,
@@ -161,15 +126,19 @@ async def plan_route(request: RoutePlanRequest):
     # Category fallback for not-found items
     not_found = [item for item in items if item not in all_found_items]
     
+    # Each category's cheapest comes from the unit-price ranking storage
+    # keeps with the active-deals cache, looked up once per category
+    cheapest_in_category = {}
+    
     for item in not_found:
         item_category = guess_category(item)
         if item_category == "Other":
             continue
             
-        category_deals = [d for d in all_deals if d.get('category') == item_category]
-        if category_deals:
-            category_deals.sort(key=lambda d: parse_unit_price(d))
-            best = category_deals[0]
+        if item_category not in cheapest_in_category:
+            cheapest_in_category[item_category] = storage.get_cheapest_active_deals(item_category)
+        if cheapest_in_category[item_category]:
+            best = cheapest_in_category[item_category][0]
             category_alternatives.append({
                 "original_item": item,
                 "suggestion": best.get('product_name'),
@@ -208,13 +177,14 @@ async def plan_route(request: RoutePlanRequest):
     if not_found and not category_alternatives:
         recommendation += f" | ❌ {len(not_found)} items not found this week"
     
+    substituted_items = {a['original_item'] for a in category_alternatives}
     return {
         "status": "success",
         "recommended_stores": recommended,
         "not_recommended": not_recommended,
         "route_order": route_order,
         "total_items_found": len(all_found_items),
-        "items_not_found": [i for i in not_found if i not in [a['original_item'] for a in category_alternatives]],
+        "items_not_found": [i for i in not_found if i not in substituted_items],
         "alternatives": category_alternatives,
         "recommendation": recommendation
     }
@@ -233,18 +203,15 @@ async def get_alternatives(request: AlternativeRequest):
     for deal in all_deals:
         if deal.get('store') in excluded_stores:
             continue
-        matches = find_product_matches(item, [deal], threshold=0.6)
-        if matches:
-            same_product.append(matches[0])
+        match = find_best_product_match(item, [deal], threshold=0.6)
+        if match:
+            same_product.append(match)
     
     # Same category alternatives
     same_category = []
     if item_category != "Other":
-        category_deals = [d for d in all_deals 
-                         if d.get('category') == item_category 
-                         and d.get('store') not in excluded_stores]
-        category_deals.sort(key=lambda d: parse_unit_price(d))
-        same_category = category_deals[:5]
+        # Categories are pre-ranked by unit price once per active-deals cache fill
+        same_category = storage.get_cheapest_active_deals(item_category, limit=5, excluded_stores=excluded_stores)
     
     return {
         "item": item,
@@ -257,6 +224,8 @@ async def get_alternatives(request: AlternativeRequest):
 @router.post("/confirm")
 async def confirm_route(request: RouteConfirmRequest):
     """Confirm route and apply substitutions."""
+    # Pairs are applied in order (a chain A->B, B->C leaves only C), and a
+    # failing pair does not stop the others
     for sub in request.substitutions:
         original = sub.get('original')
         replacement = sub.get('replacement')
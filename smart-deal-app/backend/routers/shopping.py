@@ -1,49 +1,12 @@
 from fastapi import APIRouter, HTTPException, Body
 from services import storage
-from services.rag_service import find_product_matches, normalize_text, similarity_score
+from services.category_classifier import guess_category
+from services.rag_service import find_best_product_match, normalize_text, similarity_score
 from typing import List, Dict
 import re
 
 router = APIRouter(prefix="/api/shopping-list", tags=["shopping"])
 
-# Category keywords mapping
-CATEGORY_KEYWORDS = {
-    "Fruit & Veg": ["apple", "banana", "orange", "tomato", "potato", "carrot", "onion", "lettuce", "cucumber", "pepper", "lemon", "avocado", "spinach", "broccoli", "fruit", "vegetable", "salad", "berry"],
-    "Meat & Fish": ["chicken", "beef", "pork", "fish", "salmon", "tuna", "sausage", "bacon", "ham", "meat", "steak", "ground", "fillet", "shrimp"],
-    "Dairy": ["milk", "cheese", "yogurt", "butter", "cream", "egg", "eggs", "dairy", "joghurt"],
-    "Bakery": ["bread", "roll", "bun", "croissant", "cake", "pastry", "bagel", "toast"],
-    "Drinks": ["water", "juice", "cola", "soda", "beer", "wine", "coffee", "tea", "drink", "beverage"],
-    "Snacks": ["chips", "chocolate", "candy", "cookie", "biscuit", "nuts", "snack", "ice cream"],
-    "Household": ["soap", "detergent", "paper", "tissue", "cleaner", "shampoo", "toothpaste"]
-}
-
-def guess_category(item: str) -> str:
-    """Guess category based on item keywords"""
-    item_lower = item.lower()
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for kw in keywords:
-            if kw in item_lower:
-                return category
-    return "Other"
-
-def parse_unit_price(deal: Dict) -> float:
-    """Calculate price per unit/kg if possible"""
-    try:
-        price = float(deal.get('price', 0))
-        unit = deal.get('unit', '').lower()
-        # Try to normalize to per-kg or per-piece
-        if 'kg' in unit or '/kg' in unit:
-            return price  # Already per kg
-        elif 'g' in unit:
-            # Extract grams
-            match = re.search(r'(\d+)\s*g', unit)
-            if match:
-                grams = int(match.group(1))
-                return (price / grams) * 1000  # Convert to per-kg
-        return price  # Fallback to raw price
-    except:
-        return 999.0
-
 @router.get("/")
 def get_list():
     return storage.get_shopping_list()
@@ -75,7 +38,12 @@ def optimize_list(items: List[str] = Body(..., embed=True)):
             "recommendation": "No deals available right now."
         }
     
-    stores = set(d.get('store', 'Unknown') for d in all_deals)
+    # Group once up front instead of re-filtering all deals per item and store
+    deals_by_store = {}
+    for d in all_deals:
+        deals_by_store.setdefault(d.get('store', 'Unknown'), []).append(d)
+    cheapest_in_category = {}  # filled lazily from the per-category unit-price ranking
+    alternative_items = set()
     found_items = set()
     baskets = {}
     not_found = []
@@ -88,13 +56,11 @@ def optimize_list(items: List[str] = Body(..., embed=True)):
         match_type = None  # "exact" or "category"
         
         # Step 1: Try to find exact match across all stores
-        for store in stores:
-            store_deals = [d for d in all_deals if d.get('store') == store]
-            matches = find_product_matches(item, store_deals, threshold=0.6)
+        for store, store_deals in deals_by_store.items():
+            candidate = find_best_product_match(item, store_deals, threshold=0.6)
             
-            if matches:
+            if candidate:
                 # Found exact match
-                candidate = matches[0]
                 if not best_match or float(candidate.get('price', 99)) < float(best_match.get('price', 99)):
                     best_match = candidate
                     best_store = store
@@ -102,11 +68,12 @@ def optimize_list(items: List[str] = Body(..., embed=True)):
         
         # Step 2: If no exact match, find cheapest in same category
         if not best_match and item_category != "Other":
-            category_deals = [d for d in all_deals if d.get('category') == item_category]
-            if category_deals:
-                # Sort by unit price
-                category_deals.sort(key=lambda d: parse_unit_price(d))
-                best_category = category_deals[0]
+            if item_category not in cheapest_in_category:
+                cheapest_in_category[item_category] = storage.get_cheapest_active_deals(item_category)
+            if cheapest_in_category[item_category]:
+                # Cheapest by unit price
+                best_category = cheapest_in_category[item_category][0]
+                alternative_items.add(item)
                 alternatives.append({
                     "original_item": item,
                     "suggestion": best_category.get('product_name'),
@@ -127,7 +94,7 @@ def optimize_list(items: List[str] = Body(..., embed=True)):
             })
             baskets[best_store]["total_price"] += float(best_match.get('price', 0))
         else:
-            if item not in [a["original_item"] for a in alternatives]:
+            if item not in alternative_items:
                 not_found.append(item)
     
     # Format results
@@ -3,9 +3,8 @@ from pydantic import BaseModel
 import shutil
 import os
 import hashlib
-import numpy as np
-from PIL import Image
-from typing import List, Optional, Any
+import asyncio
+from typing import List, Optional
 from services.model_router import extract_deals, ExtractionMethod
 from services import storage
 from db import db
@@ -13,6 +12,13 @@ from datetime import datetime
 
 router = APIRouter()
 
+# Resolved and created once at import instead of on every upload request
+BACKEND_DIR = os.path.dirname(os.path.dirname(__file__))
+UPLOAD_DIR = os.path.join(BACKEND_DIR, "uploads")
+KB_DIR = os.path.join(BACKEND_DIR, "knowledge_base")
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(KB_DIR, exist_ok=True)
+
 class Deal(BaseModel):
     product_name: Optional[str] = "Unknown"
     price: Optional[str] = "0.00"
@@ -36,23 +42,32 @@ def calculate_file_hash(file_path: str) -> str:
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
-def convert_pdf_to_images(file_path: str) -> List[Any]:
-    """Convert first page of PDF to image array."""
+def verify_pdf(file_path: str) -> bool:
+    """Check that the PDF has at least one page without rasterizing it."""
     try:
-        from pdf2image import convert_from_path
-        # Convert first page only for quick preview
-        images = convert_from_path(file_path, first_page=1, last_page=1)
-        if not images:
-            return []
-        
-        # Convert PIL to numpy array
-        return [np.array(img) for img in images]
+        from pdf2image import pdfinfo_from_path
+        # pdfinfo only parses the document structure; rendering page 1 into
+        # an ndarray just to validate it cost a full-page decode + copy
+        info = pdfinfo_from_path(file_path)
+        return info.get("Pages", 0) > 0
     except ImportError:
         print("pdf2image not installed. Please install poppler-utils and pdf2image.")
-        return []
+        return False
+    except Exception as e:
+        print(f"PDF validation error: {e}")
+        return False
+
+def verify_image(file_path: str) -> bool:
+    """Check that the file is a readable image without decoding its pixels."""
+    try:
+        # PIL is imported on first use, not when the API boots
+        from PIL import Image
+        with Image.open(file_path) as img:
+            img.verify()
+        return True
     except Exception as e:
-        print(f"PDF Conversion Error: {e}")
-        return []
+        print(f"Image validation error: {e}")
+        return False
 
 @router.post("/upload", response_model=ExtractionResponse)
 async def upload_file(
@@ -68,16 +83,18 @@ async def upload_file(
     print(f"DEBUG: Upload request received. File: {file.filename}, Method: {extraction_method}, Model: {model_id}")
 
     # 1. Save upload temporarily to calculate hash
-    UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
     file_path = os.path.join(UPLOAD_DIR, file.filename)
     
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Blocking file I/O, hashing, validation and the deal save (with image
+        # crops) run in worker threads so other requests aren't stalled meanwhile
+        def _save_upload():
+            with open(file_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer, 1 << 20)
+        await asyncio.to_thread(_save_upload)
             
         # 2. Calculate Hash & Check Cache
-        file_hash = calculate_file_hash(file_path)
+        file_hash = await asyncio.to_thread(calculate_file_hash, file_path)
         
         # Check if hash exists in DB
         existing_upload = db.execute_query("SELECT id, deal_count FROM uploads WHERE file_hash = %s", (file_hash,))
@@ -112,14 +129,13 @@ async def upload_file(
              upload_id = existing_upload[0]['id']
              # Clear old deals for this upload
              db.execute_query("DELETE FROM deals WHERE upload_id = %s", (upload_id,))
+             storage.invalidate_deals_cache()
              # We will re-use the upload_id to insert new deals later
         else:
              upload_id = None
 
         # --- 3. Handle Markdown (Knowledge Base) ---
         if file.filename.lower().endswith(".md"):
-            KB_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "knowledge_base")
-            os.makedirs(KB_DIR, exist_ok=True)
             kb_path = os.path.join(KB_DIR, file.filename)
             
             # Save file
@@ -134,16 +150,14 @@ async def upload_file(
             }
 
         # 3. Not in Cache -> Process File (Images/PDF)
-        image_array = None
+        # Only validate here; the extractor decodes the file itself
+        is_valid = False
         if file.filename.lower().endswith(".pdf"):
-            images = convert_pdf_to_images(file_path)
-            if images:
-                image_array = images[0] 
+            is_valid = await asyncio.to_thread(verify_pdf, file_path)
         else:
-            pil_image = Image.open(file_path).convert('RGB')
-            image_array = np.array(pil_image)
+            is_valid = await asyncio.to_thread(verify_image, file_path)
                 
-        if image_array is None:
+        if not is_valid:
             raise HTTPException(400, "Could not process file as image or PDF")
 
         # 4. Get API Key
@@ -174,7 +188,10 @@ async def upload_file(
              db.execute_query("UPDATE uploads SET timestamp = CURRENT_TIMESTAMP, deal_count = %s WHERE id = %s", (len(deals), upload_id))
         
         # 7. Save Deals with Upload ID (auto-enriches with category, valid_until, and image cropping)
-        storage.save_active_deals(deals, store_name=store_name, upload_id=upload_id, visibility=visibility, source_image_path=file_path)
+        await asyncio.to_thread(
+            storage.save_active_deals,
+            deals, store_name=store_name, upload_id=upload_id, visibility=visibility, source_image_path=file_path
+        )
         
         return {
             "deals": deals,
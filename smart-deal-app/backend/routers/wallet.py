@@ -4,11 +4,11 @@ Wallet API - Loyalty cards and receipts with unified AI client.
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body
 from services import storage
 from services.ai_client import get_ai_client
-import shutil
 import os
 import uuid
 import json
 import re
+import asyncio
 from datetime import datetime
 
 router = APIRouter(prefix="/api/wallet", tags=["wallet"])
@@ -17,18 +17,10 @@ router = APIRouter(prefix="/api/wallet", tags=["wallet"])
 @router.post("/scan")
 async def scan_card(file: UploadFile = File(...)):
     """Scan loyalty card using AI vision with retry and caching."""
-    # 1. Save temp file
-    temp_filename = f"scan_{uuid.uuid4()}.jpg"
-    temp_path = os.path.join("uploads", temp_filename)
-    os.makedirs("uploads", exist_ok=True)
-    
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
     try:
-        # Read image bytes
-        with open(temp_path, "rb") as f:
-            image_bytes = f.read()
+        # The card image is only sent to the model, never kept: use the
+        # uploaded bytes directly instead of a temp file write + read back
+        image_bytes = await file.read()
         
         prompt = """Extract the 'store_name', 'card_number', and 'card_format' from this loyalty card image. 
 'card_format' should be either 'QR' (if it looks like a QR code) or 'BARCODE' (if vertical bars). 
@@ -46,10 +38,6 @@ Return ONLY JSON format: {"store_name": "...", "card_number": "...", "card_forma
     except Exception as e:
         print(f"Card Scan Error: {e}")
         return {"error": str(e)}
-    finally:
-        # Cleanup
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
 
 
 @router.get("/")
@@ -92,14 +80,16 @@ async def scan_receipt(file: UploadFile = File(...)):
     temp_path = os.path.join("uploads", temp_filename)
     os.makedirs("uploads", exist_ok=True)
     
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Read the upload once; the same bytes are kept on disk for history and
+    # sent to the model (no write-then-read-back round trip)
+    image_bytes = await file.read()
+    
+    def _save_receipt_image():
+        with open(temp_path, "wb") as buffer:
+            buffer.write(image_bytes)
+    await asyncio.to_thread(_save_receipt_image)
     
     try:
-        # Read image bytes
-        with open(temp_path, "rb") as f:
-            image_bytes = f.read()
-        
         prompt = """Analyze this receipt image and extract the following details in JSON format:
 - "store_name": The name of the store (string).
 - "total_amount": The total amount paid (float, numeric only).
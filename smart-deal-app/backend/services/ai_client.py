@@ -8,7 +8,9 @@ import time
 import json
 import os
 import base64
-from typing import Dict, Any, Optional, List, Union, AsyncIterator
+import re
+from collections import deque
+from typing import Dict, Any, Optional, List, Union, AsyncIterator, Deque
 from dataclasses import dataclass, field
 from functools import lru_cache
 from datetime import datetime
@@ -19,8 +21,48 @@ _response_cache: Dict[str, Dict] = {}
 _cache_max_size = 100
 _cache_ttl_seconds = 86400  # 24 hours
 
-# Usage tracking
-_usage_log: List[Dict] = []
+# Usage tracking: bounded, so the oldest entry drops off in O(1)
+_USAGE_LOG_MAX = 1000
+_usage_log: Deque[Dict] = deque(maxlen=_USAGE_LOG_MAX)
+# Total entries ever appended; the stats cache is keyed on it since len() plateaus
+_usage_log_appends = 0
+_usage_stats_cache: Optional[tuple] = None
+
+# Outermost JSON array/object in a model reply
+_JSON_SPAN_RE = re.compile(r'[\[\{].*[\]\}]', re.DOTALL)
+
+@lru_cache(maxsize=4)
+def _generative_client(api_key: str):
+    """A GenerativeService client bound to one API key (shared by its models)."""
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+    from google.api_core import gapic_v1
+    # Same user agent the SDK's default client sends
+    client_info = gapic_v1.client_info.ClientInfo(user_agent=f"genai-py/{genai.__version__}")
+    return glm.GenerativeServiceClient(client_options={"api_key": api_key}, client_info=client_info)
+
+
+@lru_cache(maxsize=16)
+def get_generative_model(api_key: str, model_id: str):
+    """
+    Get a cached GenerativeModel so its client connection is reused across calls.
+    
+    The model gets its own per-key client up front. genai.configure() is
+    process-global and the SDK only binds a model to the default client on
+    its first generate_content, so a handle left to that lazy binding could
+    pick up whichever key another caller configured in between.
+    """
+    import google.generativeai as genai
+    model = genai.GenerativeModel(model_id.replace("models/", ""))
+    # _client is private SDK state (pinned in requirements.txt). If a release
+    # drops it, assigning would silently fall back to the global key.
+    if not hasattr(model, "_client"):
+        raise RuntimeError(
+            f"google-generativeai {genai.__version__} has no GenerativeModel._client; "
+            "per-key clients cannot be attached"
+        )
+    model._client = _generative_client(api_key)
+    return model
 
 
 @dataclass
@@ -93,6 +135,11 @@ class AIClient:
             
         return None
     
+    def reset_api_key(self):
+        """Drop the cached API key so the next call picks up a changed key."""
+        self._api_key = None
+        self._genai = None
+    
     def _get_genai(self):
         """Lazy-load and configure genai."""
         if self._genai is None:
@@ -149,6 +196,44 @@ class AIClient:
             "timestamp": time.time()
         }
     
+    # Formats the model accepts as inline data; anything else is re-encoded
+    _PASSTHROUGH_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+    
+    def _prepare_image_part(self, image_bytes: bytes, max_size: int = 2048, quality: int = 85) -> Dict[str, Any]:
+        """
+        Build the inline image blob sent to the model.
+        
+        JPEG/PNG/WEBP images within max_size are passed through as-is (only the
+        header is parsed). Larger ones, and every other format (MPO, BMP, TIFF,
+        GIF, ...), are sent as JPEG instead of letting the SDK re-encode a
+        full-size PIL image.
+        """
+        from PIL import Image
+        import io
+        
+        pil_image = Image.open(io.BytesIO(image_bytes))
+        mime_type = self._PASSTHROUGH_FORMATS.get(pil_image.format or "")
+        fits = pil_image.width <= max_size and pil_image.height <= max_size
+        if mime_type and fits:
+            return {"mime_type": mime_type, "data": image_bytes}
+        
+        if not fits:
+            # Resize large images to prevent memory issues (max 2048px)
+            original_size = pil_image.size
+            ratio = min(max_size / pil_image.width, max_size / pil_image.height)
+            new_size = (int(pil_image.width * ratio), int(pil_image.height * ratio))
+            # JPEGs can be decoded directly at a reduced scale (DCT scaling), and
+            # reducing_gap does a cheap box reduce before the final LANCZOS pass
+            pil_image.draft("RGB", new_size)
+            pil_image = pil_image.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            print(f"[AIClient] Resized image from {original_size[0]}x{original_size[1]} to {new_size[0]}x{new_size[1]}")
+        if pil_image.mode not in ("RGB", "L"):
+            pil_image = pil_image.convert("RGB")
+        
+        buffer = io.BytesIO()
+        pil_image.save(buffer, format="JPEG", quality=quality)
+        return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
+    
     async def _wait_for_rate_limit(self):
         """Simple rate limiting."""
         current_minute = int(time.time() / 60)
@@ -220,9 +305,9 @@ class AIClient:
         }
         
         if response:
+            global _usage_log_appends
             _usage_log.append(entry)
-            if len(_usage_log) > 1000:
-                _usage_log.pop(0)
+            _usage_log_appends += 1
         
         # 2. Database Persist
         raw_out = response.content if response else ""
@@ -269,6 +354,8 @@ class AIClient:
                 self._log_usage(cached, feature, raw_input=prompt)
                 return cached
         
+        image_part = None
+        
         # Rate limiting
         await self._wait_for_rate_limit()
         
@@ -278,26 +365,21 @@ class AIClient:
             try:
                 start_time = time.time()
                 
-                genai = self._get_genai()
-                clean_model_id = model_id.replace("models/", "")
-                model_instance = genai.GenerativeModel(clean_model_id)
+                # Encode the image once; retries reuse the same payload. A
+                # corrupt upload fails here like any other attempt
+                if image_bytes and image_part is None:
+                    image_part = await asyncio.to_thread(self._prepare_image_part, image_bytes)
+                
+                api_key = self._get_api_key()
+                if api_key:
+                    model_instance = get_generative_model(api_key, model_id)
+                else:
+                    model_instance = self._get_genai().GenerativeModel(model_id.replace("models/", ""))
                 
                 # Build content parts
                 content_parts = [prompt]
-                if image_bytes:
-                    from PIL import Image
-                    import io
-                    pil_image = Image.open(io.BytesIO(image_bytes))
-                    
-                    # Resize large images to prevent memory issues (max 2048px)
-                    max_size = 2048
-                    if pil_image.width > max_size or pil_image.height > max_size:
-                        ratio = min(max_size / pil_image.width, max_size / pil_image.height)
-                        new_size = (int(pil_image.width * ratio), int(pil_image.height * ratio))
-                        pil_image = pil_image.resize(new_size, Image.Resampling.LANCZOS)
-                        print(f"[AIClient] Resized image from {pil_image.width}x{pil_image.height} to {new_size}")
-                    
-                    content_parts.append(pil_image)
+                if image_part:
+                    content_parts.append(image_part)
                 
                 # Generate (blocking call wrapped in executor with timeout)
                 loop = asyncio.get_event_loop()
@@ -337,6 +419,10 @@ class AIClient:
                 
             except Exception as e:
                 last_error = e
+                if attempt + 1 >= self.config.retry_attempts:
+                    # No retry left, don't hold the caller for another backoff
+                    print(f"[AIClient] Attempt {attempt + 1} failed: {e}")
+                    break
                 delay = self.config.retry_base_delay * (2 ** attempt)
                 print(f"[AIClient] Attempt {attempt + 1} failed: {e}. Retrying in {delay}s...")
                 await asyncio.sleep(delay)
@@ -368,41 +454,50 @@ class AIClient:
             return json.loads(text)
         except json.JSONDecodeError:
             # Try to extract JSON array/object
-            import re
-            match = re.search(r'[\[\{].*[\]\}]', text, re.DOTALL)
+            match = _JSON_SPAN_RE.search(text)
             if match:
                 return json.loads(match.group())
             raise ValueError(f"Could not parse JSON from response: {text[:200]}")
     
     @classmethod
     def get_usage_stats(cls) -> Dict[str, Any]:
-        """Get usage statistics."""
+        """Get usage statistics (recomputed only after new entries are logged)."""
+        global _usage_stats_cache
         if not _usage_log:
             return {"total": 0, "cost_usd": 0, "by_model": {}, "by_feature": {}}
+        if _usage_stats_cache is not None and _usage_stats_cache[0] == _usage_log_appends:
+            return _usage_stats_cache[1]
             
-        total_cost = sum(e.get("cost_usd", 0) for e in _usage_log)
-        total_tokens = sum(e.get("tokens", 0) for e in _usage_log)
-        cache_hits = sum(1 for e in _usage_log if e.get("cached"))
-        
+        total_cost = 0
+        total_tokens = 0
+        cache_hits = 0
         by_model = {}
         by_feature = {}
         
+        # Totals and both breakdowns in a single pass over the log
         for entry in _usage_log:
+            tokens = entry.get("tokens", 0)
+            cost = entry.get("cost_usd", 0)
+            total_cost += cost
+            total_tokens += tokens
+            if entry.get("cached"):
+                cache_hits += 1
+            
             m = entry.get("model", "unknown")
             f = entry.get("feature", "unknown")
             
             if m not in by_model:
                 by_model[m] = {"count": 0, "tokens": 0, "cost": 0}
             by_model[m]["count"] += 1
-            by_model[m]["tokens"] += entry.get("tokens", 0)
-            by_model[m]["cost"] += entry.get("cost_usd", 0)
+            by_model[m]["tokens"] += tokens
+            by_model[m]["cost"] += cost
             
             if f not in by_feature:
                 by_feature[f] = {"count": 0, "tokens": 0}
             by_feature[f]["count"] += 1
-            by_feature[f]["tokens"] += entry.get("tokens", 0)
+            by_feature[f]["tokens"] += tokens
         
-        return {
+        stats = {
             "total": len(_usage_log),
             "total_tokens": total_tokens,
             "cost_usd": round(total_cost, 4),
@@ -411,6 +506,8 @@ class AIClient:
             "by_model": by_model,
             "by_feature": by_feature
         }
+        _usage_stats_cache = (_usage_log_appends, stats)
+        return stats
 
 
 # Singleton instance
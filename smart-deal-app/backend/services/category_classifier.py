@@ -83,6 +83,60 @@ CATEGORY_KEYWORDS = {
 }
 
 
+# Shopping-list categories (route planner and basket optimizer); the first
+# category with any keyword in the item wins
+SHOPPING_CATEGORY_KEYWORDS = {
+    "Fruit & Veg": ["apple", "banana", "orange", "tomato", "potato", "carrot", "onion", "lettuce", "cucumber", "pepper", "lemon", "avocado", "spinach", "broccoli", "fruit", "vegetable", "salad", "berry"],
+    "Meat & Fish": ["chicken", "beef", "pork", "fish", "salmon", "tuna", "sausage", "bacon", "ham", "meat", "steak", "ground", "fillet", "shrimp"],
+    "Dairy": ["milk", "cheese", "yogurt", "butter", "cream", "egg", "eggs", "dairy", "joghurt"],
+    "Bakery": ["bread", "roll", "bun", "croissant", "cake", "pastry", "bagel", "toast"],
+    "Drinks": ["water", "juice", "cola", "soda", "beer", "wine", "coffee", "tea", "drink", "beverage"],
+    "Snacks": ["chips", "chocolate", "candy", "cookie", "biscuit", "nuts", "snack", "ice cream"],
+    "Household": ["soap", "detergent", "paper", "tissue", "cleaner", "shampoo", "toothpaste"]
+}
+
+
+def _index_by_prefix(keyword_table: dict) -> dict:
+    """
+    Bucket keywords by their first two characters.
+    
+    A keyword can only occur in a text that contains its leading pair, so one
+    pass over the text's character pairs yields the few candidates worth a
+    substring test, instead of testing every keyword of every category.
+    Duplicate keywords are kept (they count twice when scoring).
+    """
+    index = {}
+    for category, keywords in keyword_table.items():
+        for keyword in keywords:
+            index.setdefault(keyword[:2], []).append((category, keyword))
+    return index
+
+
+def _matched_keywords(text_lower: str, index: dict):
+    """Yield (category, keyword) for every indexed keyword occurring in text_lower"""
+    for prefix in {text_lower[i:i + 2] for i in range(len(text_lower) - 1)}:
+        for category, keyword in index.get(prefix, ()):
+            if keyword in text_lower:
+                yield category, keyword
+
+
+_KEYWORDS_BY_PREFIX = _index_by_prefix(CATEGORY_KEYWORDS)
+_SHOPPING_KEYWORDS_BY_PREFIX = _index_by_prefix(SHOPPING_CATEGORY_KEYWORDS)
+_SHOPPING_CATEGORY_RANK = {category: rank for rank, category in enumerate(SHOPPING_CATEGORY_KEYWORDS)}
+
+
+def guess_category(item: str) -> str:
+    """Shopping-list category of an item: the first category with a keyword in it, else 'Other'"""
+    best_rank = len(_SHOPPING_CATEGORY_RANK)
+    best = "Other"
+    for category, _ in _matched_keywords(item.lower(), _SHOPPING_KEYWORDS_BY_PREFIX):
+        rank = _SHOPPING_CATEGORY_RANK[category]
+        if rank < best_rank:
+            best_rank = rank
+            best = category
+    return best
+
+
 def classify_by_keywords(product_name: str) -> Optional[str]:
     """
     Classify a product using keyword matching.
@@ -95,17 +149,16 @@ def classify_by_keywords(product_name: str) -> Optional[str]:
     """
     name_lower = product_name.lower()
     
-    # Check each category
+    # Score each category; longer keywords get higher scores
+    scores = {}
+    for category, keyword in _matched_keywords(name_lower, _KEYWORDS_BY_PREFIX):
+        scores[category] = scores.get(category, 0) + len(keyword)
+    
+    # Ties go to the category listed first, as before
     best_match = None
     best_score = 0
-    
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        score = 0
-        for keyword in keywords:
-            if keyword in name_lower:
-                # Longer keywords get higher scores
-                score += len(keyword)
-        
+    for category in CATEGORY_KEYWORDS:
+        score = scores.get(category, 0)
         if score > best_score:
             best_score = score
             best_match = category
@@ -124,14 +177,13 @@ def classify_with_gemini(product_name: str) -> Optional[str]:
         Category name or None if failed
     """
     try:
-        import google.generativeai as genai
+        from services.ai_client import get_generative_model
         
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
             return None
         
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-2.0-flash-lite")
+        model = get_generative_model(api_key, "gemini-2.0-flash-lite")
         
         categories = list(CATEGORY_KEYWORDS.keys())
         prompt = f"""Classify this German supermarket product into exactly ONE category.
@@ -3,11 +3,34 @@ Service for AI-powered meal planning and recipe generation.
 Uses unified AI client for retry, caching, and cost tracking.
 """
 import asyncio
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from services.ai_client import get_ai_client
-from services.history import PriceHistoryService
+from services.history import get_history_service
 
-history_service = PriceHistoryService()
+# Prompt templates, built once and filled with str.format per request
+DEAL_LINE_TEMPLATE = "- {product} (€{price})"
+
+MENU_PROMPT_TEMPLATE = """You are a smart budget chef. Here are the current supermarket deals:
+{deal_summary}
+
+Suggest ONE delicious dinner menu that uses as many of these deals as possible.
+Return ONLY valid JSON (no markdown) with this structure:
+{{
+    "name": "Dish Name",
+    "description": "Short appetizing description",
+    "key_ingredients": ["list", "of", "ingredients", "from", "deals"],
+    "total_estimated_cost": 0.00,
+    "savings_note": "Why this is a good deal"
+}}"""
+
+RECIPE_PROMPT_TEMPLATE = """Create a simple recipe for "{dish_name}".
+Return ONLY valid JSON (no markdown) with this structure:
+{{
+    "ingredients": ["item 1", "item 2"],
+    "steps": ["Step 1", "Step 2", "Step 3"],
+    "prep_time": "15 mins",
+    "cooking_time": "20 mins"
+}}"""
 
 
 class ChefService:
@@ -24,20 +47,11 @@ class ChefService:
         if not deals:
             return self._mock_menu_suggestion()
 
-        deal_summary = "\n".join([f"- {d.get('product', d.get('product_name', 'Item'))} (€{d.get('price', '?')})" for d in deals[:15]])
-        
-        prompt = f"""You are a smart budget chef. Here are the current supermarket deals:
-{deal_summary}
-
-Suggest ONE delicious dinner menu that uses as many of these deals as possible.
-Return ONLY valid JSON (no markdown) with this structure:
-{{
-    "name": "Dish Name",
-    "description": "Short appetizing description",
-    "key_ingredients": ["list", "of", "ingredients", "from", "deals"],
-    "total_estimated_cost": 0.00,
-    "savings_note": "Why this is a good deal"
-}}"""
+        deal_summary = "\n".join(
+            DEAL_LINE_TEMPLATE.format(product=d['product'] if 'product' in d else d.get('product_name', 'Item'), price=d.get('price', '?'))
+            for d in deals[:15]
+        )
+        prompt = MENU_PROMPT_TEMPLATE.format(deal_summary=deal_summary)
         
         try:
             result = await self.client.generate_json(
@@ -73,14 +87,7 @@ Return ONLY valid JSON (no markdown) with this structure:
 
     async def generate_recipe_steps_async(self, dish_name: str) -> Dict:
         """Generate detailed cooking steps for a specific dish."""
-        prompt = f"""Create a simple recipe for "{dish_name}".
-Return ONLY valid JSON (no markdown) with this structure:
-{{
-    "ingredients": ["item 1", "item 2"],
-    "steps": ["Step 1", "Step 2", "Step 3"],
-    "prep_time": "15 mins",
-    "cooking_time": "20 mins"
-}}"""
+        prompt = RECIPE_PROMPT_TEMPLATE.format(dish_name=dish_name)
         
         try:
             return await self.client.generate_json(
@@ -121,7 +128,7 @@ Return ONLY valid JSON (no markdown) with this structure:
         
         for item in ingredients:
             clean_item = item.split(' ')[-1] if ' ' in item else item
-            best_deal = history_service.get_best_price_for_ingredient(clean_item)
+            best_deal = get_history_service().get_best_price_for_ingredient(clean_item)
             
             entry = {
                 "item": item,
@@ -168,3 +175,14 @@ Return ONLY valid JSON (no markdown) with this structure:
             "prep_time": "10 mins",
             "cooking_time": "15 mins"
         }
+
+
+# Singleton instance
+_chef_instance: Optional[ChefService] = None
+
+def get_chef_service() -> ChefService:
+    """Get the shared chef service instance (created on first use)."""
+    global _chef_instance
+    if _chef_instance is None:
+        _chef_instance = ChefService()
+    return _chef_instance
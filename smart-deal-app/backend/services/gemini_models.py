@@ -2,7 +2,6 @@
 Gemini Multi-Model Comparison Service.
 Supports comparing extraction results across different Gemini model variants.
 """
-import google.generativeai as genai
 from typing import List, Dict, Any
 from dataclasses import dataclass
 import time
@@ -19,6 +18,8 @@ class GeminiModelSpec:
     description: str
 
 # Available Gemini models for comparison (Restricted to 2.5+)
+JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
 GEMINI_MODELS = [
     GeminiModelSpec(
         "gemini-2.5-flash",
@@ -84,10 +85,11 @@ async def extract_with_model(
     api_key: str
 ) -> Dict[str, Any]:
     """Extract deals using a specific Gemini model"""
+    from services.ai_client import get_generative_model
+    
     start_time = time.time()
     
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(model_id)
+    model = get_generative_model(api_key, model_id)
     
     # Read file
     with open(file_path, 'rb') as f:
@@ -123,7 +125,7 @@ async def extract_with_model(
         clean_text = text.replace('```json', '').replace('```', '').strip()
         
         # Try finding JSON array
-        json_match = re.search(r'\[.*\]', clean_text, re.DOTALL)
+        json_match = JSON_ARRAY_RE.search(clean_text)
         deals = []
         if json_match:
             try:
@@ -235,17 +237,23 @@ def calculate_metrics(gt_deals: List[Dict], pred_deals: List[Dict]) -> Dict[str,
     if not gt_deals:
         return {"precision": 0, "recall": 0, "f1": 0}
     
-    # Simple name matching
+    # Simple name matching; ground-truth names are lowercased once, and an
+    # exact name hit is found by set lookup before the pairwise substring scan
+    gt_names = [name for name in ((gt.get("product_name") or "").lower() for gt in gt_deals) if name]
+    gt_name_set = set(gt_names)
     matched = 0
     for pred in pred_deals:
         pred_name = (pred.get("product_name") or "").lower()
-        for gt in gt_deals:
-            gt_name = (gt.get("product_name") or "").lower()
-            # Fuzzy match: check if significant overlap
-            if pred_name and gt_name:
-                if pred_name in gt_name or gt_name in pred_name:
-                    matched += 1
-                    break
+        if not pred_name:
+            continue
+        if pred_name in gt_name_set:
+            matched += 1
+            continue
+        # Fuzzy match: check if significant overlap
+        for gt_name in gt_names:
+            if pred_name in gt_name or gt_name in pred_name:
+                matched += 1
+                break
     
     precision = matched / len(pred_deals) if pred_deals else 0
     recall = matched / len(gt_deals) if gt_deals else 0
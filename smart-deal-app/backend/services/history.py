@@ -1,6 +1,5 @@
 from db import db
 from typing import List, Dict, Optional
-import pandas as pd
 from datetime import datetime, timedelta
 
 class PriceHistoryService:
@@ -56,3 +55,14 @@ class PriceHistoryService:
                 "found_at": str(r['created_at'])
             }
         return None
+
+
+# Singleton instance
+_history_instance: Optional[PriceHistoryService] = None
+
+def get_history_service() -> PriceHistoryService:
+    """Get the shared price history service instance."""
+    global _history_instance
+    if _history_instance is None:
+        _history_instance = PriceHistoryService()
+    return _history_instance
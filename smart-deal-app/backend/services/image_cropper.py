@@ -20,11 +20,51 @@ def ensure_crops_dir(store: str) -> Path:
     return store_dir
 
 
+def _save_crop(img: Image.Image, bbox: List[float], store: str, output_path: Path) -> Optional[str]:
+    """Crop, downscale and save one product image; returns its URL path."""
+    width, height = img.size
+    
+    # Convert normalized bbox to pixel coordinates
+    x_min = int(bbox[0] * width)
+    y_min = int(bbox[1] * height)
+    x_max = int(bbox[2] * width)
+    y_max = int(bbox[3] * height)
+    
+    # Validate coordinates
+    if x_min >= x_max or y_min >= y_max:
+        print(f"  ⚠️ Invalid bbox dimensions: {bbox}")
+        return None
+    
+    # Crop the image
+    cropped = img.crop((x_min, y_min, x_max, y_max))
+    
+    # Ensure output directory exists
+    store_dir = ensure_crops_dir(store)
+    
+    # Resize if too large (max 400px width)
+    if cropped.width > 400:
+        ratio = 400 / cropped.width
+        new_size = (400, int(cropped.height * ratio))
+        cropped = cropped.resize(new_size, Image.Resampling.LANCZOS)
+    
+    # Convert to RGB if necessary (JPEG has no alpha/palette)
+    if cropped.mode not in ('RGB', 'L'):
+        cropped = cropped.convert('RGB')
+    
+    # Save as JPEG: encodes ~50x faster than WebP for a ~20% larger file,
+    # and crops are produced inline while an upload's deals are saved
+    cropped.save(output_path, 'JPEG', quality=85)
+    
+    # Return relative URL path (for frontend)
+    return f"/crops/{store_dir.name}/{output_path.name}"
+
+
 def crop_product_image(
     source_image_path: str,
     bbox: List[float],
     store: str,
-    product_name: str
+    product_name: str,
+    source_image: Optional[Image.Image] = None
 ) -> Optional[str]:
     """
     Crop a product image from a flyer page using normalized bbox coordinates.
@@ -34,6 +74,8 @@ def crop_product_image(
         bbox: [x_min, y_min, x_max, y_max] normalized coordinates (0-1)
         store: Store name for organizing output
         product_name: Product name for generating unique filename
+        source_image: Already opened source image; pass the same one for every
+            deal on a page so the flyer is decoded once instead of per crop
     
     Returns:
         Relative URL path to the cropped image, or None if failed
@@ -47,52 +89,24 @@ def crop_product_image(
             print(f"  ⚠️ Invalid bbox: {bbox}")
             return None
         
-        # Open source image
-        with Image.open(source_image_path) as img:
-            width, height = img.size
-            
-            # Convert normalized bbox to pixel coordinates
-            x_min = int(bbox[0] * width)
-            y_min = int(bbox[1] * height)
-            x_max = int(bbox[2] * width)
-            y_max = int(bbox[3] * height)
-            
-            # Validate coordinates
-            if x_min >= x_max or y_min >= y_max:
-                print(f"  ⚠️ Invalid bbox dimensions: {bbox}")
-                return None
-            
-            # Crop the image
-            cropped = img.crop((x_min, y_min, x_max, y_max))
-            
-            # Generate unique filename based on content
-            hash_input = f"{source_image_path}_{bbox}_{product_name}"
-            file_hash = hashlib.md5(hash_input.encode()).hexdigest()[:12]
-            
-            # Ensure output directory exists
-            store_dir = ensure_crops_dir(store)
-            
-            # Save as WebP for smaller file size
-            output_filename = f"{file_hash}.webp"
-            output_path = store_dir / output_filename
-            
-            # Resize if too large (max 400px width)
-            if cropped.width > 400:
-                ratio = 400 / cropped.width
-                new_size = (400, int(cropped.height * ratio))
-                cropped = cropped.resize(new_size, Image.Resampling.LANCZOS)
-            
-            # Convert to RGB if necessary (for WebP compatibility)
-            if cropped.mode in ('RGBA', 'P'):
-                cropped = cropped.convert('RGB')
-            
-            # Save with good quality
-            cropped.save(output_path, 'WEBP', quality=85)
-            
-            # Return relative URL path (for frontend)
-            store_slug = store.lower().replace(" ", "_")
+        # Stable key: same source file (path + size + mtime), bbox and product
+        # always map to the same crop, so repeated saves reuse the file on disk
+        stat = os.stat(source_image_path)
+        bbox_key = ",".join(f"{float(v):.4f}" for v in bbox)
+        hash_input = f"{os.path.abspath(source_image_path)}_{stat.st_size}_{stat.st_mtime_ns}_{bbox_key}_{product_name}"
+        file_hash = hashlib.md5(hash_input.encode()).hexdigest()[:12]
+        
+        store_slug = store.lower().replace(" ", "_")
+        output_filename = f"{file_hash}.jpg"
+        output_path = CROPS_DIR / store_slug / output_filename
+        if output_path.exists():
             return f"/crops/{store_slug}/{output_filename}"
-            
+        
+        if source_image is None:
+            with Image.open(source_image_path) as img:
+                return _save_crop(img, bbox, store, output_path)
+        return _save_crop(source_image, bbox, store, output_path)
+    
     except Exception as e:
         print(f"  ⚠️ Error cropping image: {e}")
         return None
@@ -141,19 +155,21 @@ def batch_crop_from_annotations(
             if not deals:
                 continue
                 
-            for deal in deals:
-                product_name = deal.get('product_name', '')
-                bbox = deal.get('bbox')
-                
-                if product_name and bbox:
-                    image_url = crop_product_image(
-                        str(image_path),
-                        bbox,
-                        store,
-                        product_name
-                    )
-                    if image_url:
-                        results[product_name] = image_url
+            with Image.open(image_path) as page:
+                for deal in deals:
+                    product_name = deal.get('product_name', '')
+                    bbox = deal.get('bbox')
+                    
+                    if product_name and bbox:
+                        image_url = crop_product_image(
+                            str(image_path),
+                            bbox,
+                            store,
+                            product_name,
+                            source_image=page
+                        )
+                        if image_url:
+                            results[product_name] = image_url
                         
         except Exception as e:
             print(f"  ⚠️ Error processing {json_file.name}: {e}")
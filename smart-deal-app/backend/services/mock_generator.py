@@ -1,4 +1,4 @@
-import random
+import numpy as np
 from services import storage
 from db import db
 from datetime import datetime, timedelta
@@ -42,74 +42,67 @@ CATEGORIES = {
 
 UNITS = ["500g", "1kg", "100g", "1.5L", "1L", "0.75L", "Packung", "Stück", "250g", "200g"]
 
-def generate_price():
-    # Generate psychological prices: x.99, x.49, x.29
-    base = random.randint(0, 15)
-    decimal = random.choice([99, 49, 29, 79, 19])
-    return f"{base}.{decimal}" if base > 0 else f"0.{decimal}"
+# Psychological prices: x.99, x.49, x.29, ...
+PRICE_DECIMALS = [99, 49, 29, 79, 19]
+DISCOUNTS = [0.1, 0.2, 0.3, 0.4, 0.5]
 
-def generate_mock_data(count=2000):
+def generate_prices(rng, count):
+    """Random (original_prices, sale_prices) for count deals, as 2-decimal strings"""
+    original = rng.integers(0, 16, count) + rng.choice(PRICE_DECIMALS, count) / 100
+    sale = original * (1 - rng.choice(DISCOUNTS, count))
+    return np.char.mod("%.2f", original), np.char.mod("%.2f", sale)
+
+# Flattened product tables, built once at import: generate_mock_data only has
+# to compute one flat index per deal and gather names from these arrays
+_CATEGORY_NAMES = list(CATEGORIES.keys())
+_CATEGORY_SIZES = np.array([len(CATEGORIES[c]) for c in _CATEGORY_NAMES])
+_CATEGORY_OFFSETS = np.concatenate(([0], np.cumsum(_CATEGORY_SIZES)[:-1]))
+_PRODUCT_NAMES = np.array([p for c in _CATEGORY_NAMES for p in CATEGORIES[c]], dtype=object)
+# Random "Bio" prefix variant, unchanged if the product already is Bio
+_BIO_PRODUCT_NAMES = np.array([p if "Bio" in p else f"Bio {p}" for p in _PRODUCT_NAMES], dtype=object)
+_CATEGORY_LABELS = np.array(_CATEGORY_NAMES, dtype=object)
+_STORES = np.array(STORES, dtype=object)
+_UNITS = np.array(UNITS, dtype=object)
+
+def generate_mock_data(count=2000, seed=None):
     print(f"Generating {count} mock deals...")
-    deals = []
     
     # 1. Clear existing deals? Optional, but maybe safer for "Demo Mode" to wipe slate or just append.
     # Let's just append for now, user can use "Reset" button if they want clean slate.
     
-    # 2. Generate
+    # 2. Generate: draw every column at once instead of per-deal RNG calls
     start_date = datetime.now()
+    rng = np.random.default_rng(seed)
+    category_idx = rng.integers(0, len(_CATEGORY_NAMES), count)
+    product_idx = _CATEGORY_OFFSETS[category_idx] + (rng.random(count) * _CATEGORY_SIZES[category_idx]).astype(np.intp)
+    stores = _STORES[rng.integers(0, len(STORES), count)]
+    units = _UNITS[rng.integers(0, len(UNITS), count)]
+    original_prices, sale_prices = generate_prices(rng, count)
+    bio_rolls = rng.random(count) > 0.8
+    products = np.where(bio_rolls, _BIO_PRODUCT_NAMES[product_idx], _PRODUCT_NAMES[product_idx])
+    day_offsets = rng.integers(0, 8, count)  # Spread over last week
+    dates = [start_date - timedelta(days=d) for d in range(8)]
     
-    for _ in range(count):
-        category = random.choice(list(CATEGORIES.keys()))
-        product = random.choice(CATEGORIES[category])
-        store = random.choice(STORES)
-        
-        # Add random "Bio" or Brand prefix sometimes if not present
-        if random.random() > 0.8 and "Bio" not in product:
-             product = f"Bio {product}"
-             
-        original_price = generate_price()
-        # Discount logic
-        price_float = float(original_price)
-        discount_percent = random.choice([0.1, 0.2, 0.3, 0.4, 0.5])
-        sale_price_float = price_float * (1 - discount_percent)
-        sale_price = f"{sale_price_float:.2f}"
-        
-        deal = {
-            "product_name": product,
-            "price": sale_price,
-            "original_price": original_price,
-            "unit": random.choice(UNITS),
-            "store": store,
-            "category": category,
-            "image_url": None, # Could map to static placeholders if we had them
-            "confidence": 1.0,
-            "source": "mock_generator",
-            "created_at": start_date - timedelta(days=random.randint(0, 7)) # Spread over last week
-        }
-        deals.append(deal)
-
-    # 3. Batch Insert (Slow but safe loop for now, or could optimize)
-    # Using existing storage.save_active_deals might handle one by one or small batch.
-    # storage.save_active_deals expects a list, so we can pass it all if it handles it.
-    
-    # Actually storage.save_active_deals is designed for one upload batch. 
-    # Let's use a direct DB insert for speed for 2000 items.
-    
-    values = []
-    for d in deals:
-        values.append((
-             None, # upload_id
-             d['product_name'],
-             d['price'],
-             d['original_price'],
-             d['unit'],
-             d['store'],
-             d['confidence'],
-             d['source'],
-             d['category'],
-             d['image_url'],
-             d['created_at']
-        ))
+    # 3. Batch Insert rows directly (storage.save_active_deals is designed for one upload batch)
+    values = [
+        (
+            None, # upload_id
+            product,
+            sale,
+            orig,
+            unit,
+            store,
+            1.0, # confidence
+            "mock_generator",
+            category,
+            None, # image_url: could map to static placeholders if we had them
+            dates[days]
+        )
+        for product, sale, orig, unit, store, category, days in zip(
+            products.tolist(), sale_prices.tolist(), original_prices.tolist(), units.tolist(),
+            stores.tolist(), _CATEGORY_LABELS[category_idx].tolist(), day_offsets.tolist()
+        )
+    ]
     
     # Chunking to avoid massive query
     chunk_size = 500
@@ -122,5 +115,6 @@ def generate_mock_data(count=2000):
         chunk = values[i:i+chunk_size]
         db.execute_many(query, chunk)
         
-    print(f"Successfully inserted {len(deals)} items.")
-    return len(deals)
+    storage.invalidate_deals_cache()
+    print(f"Successfully inserted {len(values)} items.")
+    return len(values)
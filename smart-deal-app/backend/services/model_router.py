@@ -2,36 +2,220 @@
 Model Router - Multi-method extraction with usage tracking.
 Supports: Gemini API / Local VLM (Ollama) / OCR Pipeline
 """
+from collections import deque
 from enum import Enum
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Deque
 from datetime import datetime
 import time
 import json
 import os
 import asyncio
+import hashlib
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 class ExtractionMethod(Enum):
     GEMINI = "gemini"
     LOCAL_VLM = "local_vlm"
     OCR_PIPELINE = "ocr_pipeline"
 
-# In-memory usage tracking (will persist to file)
-USAGE_LOG_FILE = "dataset/usage_logs.json"
-usage_logs: List[Dict] = []
+# In-memory usage tracking, persisted as append-only JSON lines.
+# usage_logs is a bounded deque (other modules import it by name), so only the
+# last USAGE_LOG_MAX_ENTRIES are kept and appends stay O(1); the file is
+# compacted once it doubles.
+USAGE_LOG_FILE = "dataset/usage_logs.jsonl"
+LEGACY_USAGE_LOG_FILE = "dataset/usage_logs.json"
+USAGE_LOG_MAX_ENTRIES = 1000
+usage_logs: Deque[Dict] = deque(maxlen=USAGE_LOG_MAX_ENTRIES)
+_usage_log_file_lines = 0
+
+# get_usage_stats results per `days`, dropped whenever a log entry is added
+_usage_stats_cache: Dict[int, tuple] = {}
+_usage_stats_cache_max_size = 16
+
+def _log_line(entry: Dict) -> bytes:
+    """One JSON-lines record, encoded with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(entry) + b"\n"
+    return (json.dumps(entry) + "\n").encode("utf-8")
+
+_loads = orjson.loads if orjson is not None else json.loads
 
 def load_usage_logs():
-    global usage_logs
+    global _usage_log_file_lines
+    entries = []
+    migrated = False
     try:
         if os.path.exists(USAGE_LOG_FILE):
-            with open(USAGE_LOG_FILE, 'r') as f:
-                usage_logs = json.load(f)
+            with open(USAGE_LOG_FILE, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            entries.append(_loads(line))
+                        except ValueError:
+                            continue  # Skip a torn last line
+            _usage_log_file_lines = len(entries)
+        elif os.path.exists(LEGACY_USAGE_LOG_FILE):
+            with open(LEGACY_USAGE_LOG_FILE, 'r') as f:
+                entries = json.load(f)
+            migrated = True
     except:
-        usage_logs = []
+        entries = []
+        migrated = False
+    usage_logs.clear()
+    usage_logs.extend(entries)
+    _usage_stats_cache.clear()
+    if migrated:
+        # Persist the legacy history as JSON lines now; otherwise the first
+        # append creates a .jsonl holding only itself, which wins next start
+        try:
+            save_usage_logs()
+        except OSError as e:
+            print(f"Failed to migrate {LEGACY_USAGE_LOG_FILE}: {e}")
 
 def save_usage_logs():
+    """Rewrite the log file with only the retained entries (compaction)"""
+    global _usage_log_file_lines
+    os.makedirs(os.path.dirname(USAGE_LOG_FILE), exist_ok=True)
+    tmp_path = USAGE_LOG_FILE + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b"".join(_log_line(entry) for entry in usage_logs))
+    os.replace(tmp_path, USAGE_LOG_FILE)
+    _usage_log_file_lines = len(usage_logs)
+
+def _append_usage_log(entry: Dict):
+    global _usage_log_file_lines
+    usage_logs.append(entry)
+    _usage_stats_cache.clear()
+    
+    if _usage_log_file_lines >= 2 * USAGE_LOG_MAX_ENTRIES:
+        save_usage_logs()
+        return
     os.makedirs(os.path.dirname(USAGE_LOG_FILE), exist_ok=True)
-    with open(USAGE_LOG_FILE, 'w') as f:
-        json.dump(usage_logs[-1000:], f)  # Keep last 1000 entries
+    with open(USAGE_LOG_FILE, 'ab') as f:
+        f.write(_log_line(entry))
+    _usage_log_file_lines += 1
+
+# OCR results cache keyed by file content hash; Tesseract output depends only
+# on the pixels, so re-extracting the same flyer skips conversion, OCR and the
+# regex parse entirely. Holds the parsed (product_name, price) pairs; the
+# per-request fields (store, extraction_date) are added on every call.
+_ocr_results_cache: Dict[str, List[tuple]] = {}
+_ocr_cache_max_size = 50
+
+def _file_digest(file_path: str) -> str:
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for byte_block in iter(lambda: f.read(65536), b""):
+            sha256_hash.update(byte_block)
+    return sha256_hash.hexdigest()
+
+def _cache_ocr_results(digest: str, pairs: List[tuple]):
+    # Evict oldest insertion if at capacity
+    if len(_ocr_results_cache) >= _ocr_cache_max_size:
+        del _ocr_results_cache[next(iter(_ocr_results_cache))]
+    _ocr_results_cache[digest] = pairs
+
+# Regexes compiled once at import
+# Pattern: product name followed by price
+PRICE_LINE_RE = re.compile(r'([A-Za-zäöüÄÖÜß\s]+)\s*(\d+[,\.]\d{2})\s*€?')
+JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+def _parse_ocr_prices(text: str) -> List[tuple]:
+    """Pull (product_name, price) pairs out of raw OCR text"""
+    pairs = []
+    for match in PRICE_LINE_RE.findall(text):
+        product = match[0].strip()
+        price = float(match[1].replace(',', '.'))
+        if len(product) > 3 and price < 100:  # Basic validation
+            pairs.append((product, price))
+    return pairs
+
+# Rasterized first PDF page (or decoded image file) keyed by file content
+# hash, shared by every extraction method; comparing models on one flyer
+# renders/decodes it only once.
+_pdf_page_cache: Dict[str, Any] = {}
+_pdf_page_cache_max_size = 4  # full-page RGB renders are ~10 MB each
+
+# In-flight renders/decodes by digest, so concurrent extractions of the same
+# file (e.g. the /compare endpoint) wait for one load instead of each starting one
+_page_image_loads: Dict[str, asyncio.Future] = {}
+
+def _cache_page_image(digest: str, page):
+    if len(_pdf_page_cache) >= _pdf_page_cache_max_size:
+        del _pdf_page_cache[next(iter(_pdf_page_cache))]
+    _pdf_page_cache[digest] = page
+
+async def _cached_page_image(digest: str, load, file_path: str):
+    page = _pdf_page_cache.get(digest)
+    if page is not None:
+        return page
+    future = _page_image_loads.get(digest)
+    if future is None:
+        future = asyncio.ensure_future(asyncio.to_thread(load, file_path))
+        _page_image_loads[digest] = future
+        try:
+            page = await asyncio.shield(future)
+            _cache_page_image(digest, page)
+        finally:
+            _page_image_loads.pop(digest, None)
+        return page
+    return await asyncio.shield(future)
+
+def _convert_first_page(file_path: str):
+    from pdf2image import convert_from_path
+    images = convert_from_path(file_path, first_page=1, last_page=1)
+    if not images:
+        raise ValueError("Could not convert PDF to image")
+    return images[0]
+
+async def _render_pdf_first_page(file_path: str, digest: Optional[str] = None):
+    """Convert the first page of a PDF to a PIL image (cached)"""
+    if digest is None:
+        digest = await asyncio.to_thread(_file_digest, file_path)
+    return await _cached_page_image(digest, _convert_first_page, file_path)
+
+def _decode_image(file_path: str):
+    from PIL import Image
+    img = Image.open(file_path)
+    img.load()  # Decode now (in the worker thread), not lazily on first use
+    return img
+
+async def _load_page_image(file_path: str, digest: Optional[str] = None):
+    """First page of a PDF, or the decoded image file, as a PIL image (cached)"""
+    if file_path.lower().endswith('.pdf'):
+        return await _render_pdf_first_page(file_path, digest)
+    if digest is None:
+        digest = await asyncio.to_thread(_file_digest, file_path)
+    return await _cached_page_image(digest, _decode_image, file_path)
+
+# The AI client downsizes anything larger than this before upload; sizing the
+# image here means it is JPEG-encoded once rather than at full size and again
+GEMINI_MAX_IMAGE_SIDE = 2048
+GEMINI_JPEG_QUALITY = 85
+
+def _encode_for_gemini(image, source_path: Optional[str] = None) -> bytes:
+    """JPEG bytes for a Gemini request; an unmodified small JPEG file is sent as-is"""
+    from PIL import Image
+    import io
+    fits = image.width <= GEMINI_MAX_IMAGE_SIDE and image.height <= GEMINI_MAX_IMAGE_SIDE
+    if source_path and fits and image.format == 'JPEG':
+        with open(source_path, 'rb') as f:
+            return f.read()
+    if not fits:
+        ratio = min(GEMINI_MAX_IMAGE_SIDE / image.width, GEMINI_MAX_IMAGE_SIDE / image.height)
+        new_size = (int(image.width * ratio), int(image.height * ratio))
+        image = image.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")  # JPEG has no alpha/palette
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=GEMINI_JPEG_QUALITY)
+    return buffer.getvalue()
 
 def log_usage(
     method: ExtractionMethod,
@@ -53,71 +237,96 @@ def log_usage(
         "success": success,
         "error": error
     }
-    usage_logs.append(entry)
-    save_usage_logs()
+    _append_usage_log(entry)
     return entry
 
 def get_usage_stats(days: int = 7) -> Dict:
     """Get usage statistics for the last N days"""
-    load_usage_logs()
     from datetime import timedelta
     cutoff = datetime.now() - timedelta(days=days)
     
-    recent = [log for log in usage_logs 
-              if datetime.fromisoformat(log["timestamp"]) > cutoff]
+    # Still exact until a new entry is logged or the oldest counted one ages out
+    cached = _usage_stats_cache.get(days)
+    if cached is not None and (cached[0] is None or cached[0] > cutoff):
+        return _copy_usage_stats(cached[1])
+    
+    known_methods = {method.value for method in ExtractionMethod}
+    
+    # Single pass: accumulate overall and per-method totals together
+    # instead of re-scanning the recent logs once per aggregate.
+    totals = {"count": 0, "deals": 0, "tokens": 0, "duration_ms": 0, "successes": 0}
+    by_method: Dict[str, Dict] = {}
+    oldest = None
+    for log in usage_logs:
+        logged_at = datetime.fromisoformat(log["timestamp"])
+        if logged_at <= cutoff:
+            continue
+        if oldest is None or logged_at < oldest:
+            oldest = logged_at
+        buckets = [totals]
+        method = log["method"]
+        if method in known_methods:
+            bucket = by_method.get(method)
+            if bucket is None:
+                bucket = by_method[method] = {"count": 0, "deals": 0, "tokens": 0, "duration_ms": 0, "successes": 0}
+            buckets.append(bucket)
+        deal_count = log.get("deal_count", 0)
+        tokens = log.get("tokens_used", 0)
+        duration = log.get("duration_ms", 0)
+        success = 1 if log.get("success") else 0
+        for bucket in buckets:
+            bucket["count"] += 1
+            bucket["deals"] += deal_count
+            bucket["tokens"] += tokens
+            bucket["duration_ms"] += duration
+            bucket["successes"] += success
     
     stats = {
-        "total_extractions": len(recent),
-        "total_deals": sum(log.get("deal_count", 0) for log in recent),
-        "total_tokens": sum(log.get("tokens_used", 0) for log in recent),
+        "total_extractions": totals["count"],
+        "total_deals": totals["deals"],
+        "total_tokens": totals["tokens"],
         "by_method": {},
         "success_rate": 0,
         "avg_duration_ms": 0
     }
     
-    # Group by method
+    # Group by method (enum order, as before)
     for method in ExtractionMethod:
-        method_logs = [l for l in recent if l["method"] == method.value]
-        if method_logs:
+        bucket = by_method.get(method.value)
+        if bucket:
             stats["by_method"][method.value] = {
-                "count": len(method_logs),
-                "deals": sum(l.get("deal_count", 0) for l in method_logs),
-                "tokens": sum(l.get("tokens_used", 0) for l in method_logs),
-                "avg_duration_ms": sum(l.get("duration_ms", 0) for l in method_logs) // len(method_logs),
-                "success_rate": sum(1 for l in method_logs if l.get("success")) / len(method_logs) * 100
+                "count": bucket["count"],
+                "deals": bucket["deals"],
+                "tokens": bucket["tokens"],
+                "avg_duration_ms": bucket["duration_ms"] // bucket["count"],
+                "success_rate": bucket["successes"] / bucket["count"] * 100
             }
     
-    if recent:
-        stats["success_rate"] = sum(1 for l in recent if l.get("success")) / len(recent) * 100
-        stats["avg_duration_ms"] = sum(l.get("duration_ms", 0) for l in recent) // len(recent)
+    if totals["count"]:
+        stats["success_rate"] = totals["successes"] / totals["count"] * 100
+        stats["avg_duration_ms"] = totals["duration_ms"] // totals["count"]
     
-    return stats
+    if len(_usage_stats_cache) >= _usage_stats_cache_max_size:
+        _usage_stats_cache.pop(next(iter(_usage_stats_cache)))
+    _usage_stats_cache[days] = (oldest, stats)
+    return _copy_usage_stats(stats)
+
+def _copy_usage_stats(stats: Dict) -> Dict:
+    """Callers get their own copy so the cached stats can't be mutated"""
+    return {**stats, "by_method": {method: dict(bucket) for method, bucket in stats["by_method"].items()}}
 
 async def extract_with_gemini(file_path: str, store_name: str, model_id: str = "gemini-2.5-flash-lite", region: Optional[List[float]] = None) -> Dict:
     """Extract using Gemini API via unified AI client."""
     from services.ai_client import get_ai_client
-    import re
-    from PIL import Image
-    import io
     
     start_time = time.time()
     client = get_ai_client()
     
-    # Handle Image Loading (PDF or Image)
-    if file_path.lower().endswith('.pdf'):
-        try:
-            from pdf2image import convert_from_path
-            # Convert first page only
-            images = await asyncio.to_thread(convert_from_path, file_path, first_page=1, last_page=1)
-            if images:
-                image_obj = images[0]
-            else:
-                 raise ValueError("Could not convert PDF to image")
-        except ImportError:
-             raise ImportError("pdf2image not installed. Please install poppler-utils and pdf2image.")
-    else:
-        # Read image file directly
-        image_obj = Image.open(file_path)
+    # Handle Image Loading (first page of a PDF, or the image itself)
+    try:
+        image_obj = page_image = await _load_page_image(file_path)
+    except ImportError:
+         raise ImportError("pdf2image not installed. Please install poppler-utils and pdf2image.")
     
     # Apply Cropping if region provided [x_min, y_min, x_max, y_max]
     if region and len(region) == 4:
@@ -131,10 +340,8 @@ async def extract_with_gemini(file_path: str, store_name: str, model_id: str = "
         if x_min < x_max and y_min < y_max:
              image_obj = image_obj.crop((x_min, y_min, x_max, y_max))
     
-    # Convert to bytes for API
-    img_byte_arr = io.BytesIO()
-    image_obj.save(img_byte_arr, format='JPEG')
-    file_data = img_byte_arr.getvalue()
+    # Convert to bytes for API (off the event loop, encoded once at the final size)
+    file_data = await asyncio.to_thread(_encode_for_gemini, image_obj, file_path if image_obj is page_image else None)
     
     prompt = """You are an expert data extractor for German supermarket flyers.
 Analyze the provided image and extract ALL product deals.
@@ -176,7 +383,7 @@ Extract ALL products visible on the page. Return ONLY the JSON array, no other t
         text = response.content
         
         # Parse JSON from response
-        json_match = re.search(r'\[.*\]', text, re.DOTALL)
+        json_match = JSON_ARRAY_RE.search(text)
         
         deals = []
         if json_match:
@@ -279,22 +486,12 @@ Extract ALL products visible on the page. Return ONLY the JSON array, no other t
 async def extract_with_local_vlm(file_path: str, store_name: str, model_id: str = "llava:7b", endpoint: str = "http://localhost:11434", region: Optional[List[float]] = None) -> Dict:
     """Extract using local VLM (Ollama with LLaVA)"""
     from extractors.ollama_extractor import extract_with_ollama
-    from PIL import Image
-    import numpy as np
     
     start_time = time.time()
     
     try:
-        # Load image
-        if file_path.lower().endswith('.pdf'):
-            from pdf2image import convert_from_path
-            # Convert first page only for now
-            images = await asyncio.to_thread(convert_from_path, file_path, first_page=1, last_page=1)
-            if not images:
-                raise ValueError("Empty PDF")
-            img = images[0]
-        else:
-            img = Image.open(file_path)
+        # Load image (first page only for PDFs)
+        img = await _load_page_image(file_path)
         
         # Apply Cropping if region provided
         if region and len(region) == 4:
@@ -306,13 +503,11 @@ async def extract_with_local_vlm(file_path: str, store_name: str, model_id: str
             if x_min < x_max and y_min < y_max:
                 img = img.crop((x_min, y_min, x_max, y_max))
 
-        # Convert to numpy array for extractor
-        img_array = np.array(img)
-        
-        # Run in thread since it might be blocking
+        # Run in thread since it might be blocking; the PIL image is passed
+        # straight through (no ndarray copy just to rebuild a PIL image)
         result = await asyncio.to_thread(
             extract_with_ollama,
-            image_array=img_array,
+            image_array=img,
             model_id=model_id, 
             language="German"
         )
@@ -358,55 +553,53 @@ async def extract_with_local_vlm(file_path: str, store_name: str, model_id: str
 async def extract_with_ocr(file_path: str, store_name: str) -> Dict:
     """Extract using OCR pipeline (Tesseract + regex parsing)"""
     import subprocess
-    import re
+    import io
     
     start_time = time.time()
     deals = []
     
     try:
-        # Convert PDF to image if needed
-        if file_path.endswith('.pdf'):
-            from pdf2image import convert_from_path
-            # Use to_thread for blocking conversion
-            images = await asyncio.to_thread(convert_from_path, file_path, first_page=1, last_page=3)
-            temp_img = "/tmp/ocr_temp.png"
-            images[0].save(temp_img, 'PNG')
-            img_path = temp_img
-        else:
-            img_path = file_path
+        digest = await asyncio.to_thread(_file_digest, file_path)
+        pairs = _ocr_results_cache.get(digest)
         
-        # Run Tesseract OCR in a thread
-        def _run_tesseract():
-            return subprocess.run(
-                ['tesseract', img_path, 'stdout', '-l', 'deu+eng'],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+        if pairs is None:
+            # Convert PDF to image if needed
+            if file_path.endswith('.pdf'):
+                page = await _render_pdf_first_page(file_path, digest)
+                # Hand the page to tesseract over stdin instead of a temp file
+                # round-trip; lossless fast PNG, tesseract only needs the pixels
+                buffer = io.BytesIO()
+                await asyncio.to_thread(page.save, buffer, 'PNG', compress_level=1)
+                img_path, img_input = 'stdin', buffer.getvalue()
+            else:
+                img_path, img_input = file_path, None
             
-        result = await asyncio.to_thread(_run_tesseract)
-        text = result.stdout
-        
-        # Parse prices with regex
-        # Pattern: product name followed by price
-        price_pattern = r'([A-Za-zäöüÄÖÜß\s]+)\s*(\d+[,\.]\d{2})\s*€?'
-        matches = re.findall(price_pattern, text)
+            # Run Tesseract OCR in a thread
+            def _run_tesseract():
+                result = subprocess.run(
+                    ['tesseract', img_path, 'stdout', '-l', 'deu+eng'],
+                    input=img_input,
+                    capture_output=True,
+                    timeout=30
+                )
+                return result.returncode, result.stdout.decode('utf-8', errors='replace')
+                
+            returncode, text = await asyncio.to_thread(_run_tesseract)
+            pairs = _parse_ocr_prices(text)
+            if returncode == 0:
+                _cache_ocr_results(digest, pairs)
         
         date_iso = datetime.now().isoformat()
-        for match in matches:
-            product = match[0].strip()
-            price = match[1].replace(',', '.')
-            
-            if len(product) > 3 and float(price) < 100:  # Basic validation
-                deals.append({
-                    "product_name": product,
-                    "price": float(price),
-                    "store": store_name,
-                    "category": "Other",
-                    "extraction_method": "ocr_pipeline",
-                    "currency": "EUR",
-                    "extraction_date": date_iso
-                })
+        for product, price in pairs:
+            deals.append({
+                "product_name": product,
+                "price": price,
+                "store": store_name,
+                "category": "Other",
+                "extraction_method": "ocr_pipeline",
+                "currency": "EUR",
+                "extraction_date": date_iso
+            })
         
     except Exception as e:
         duration_ms = int((time.time() - start_time) * 1000)
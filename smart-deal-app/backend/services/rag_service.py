@@ -4,50 +4,80 @@ Uses fuzzy matching and category-based retrieval to find relevant deals.
 """
 from typing import List, Dict, Optional, Tuple
 from db import db
+import heapq
 import re
 from difflib import SequenceMatcher
+from functools import lru_cache
 
+_NON_WORD_RE = re.compile(r'[^a-zäöüß0-9\s]')
+
+@lru_cache(maxsize=4096)
 def normalize_text(text: str) -> str:
     """Normalize text for matching: lowercase, remove special chars"""
-    return re.sub(r'[^a-zäöüß0-9\s]', '', text.lower().strip())
+    # Cached: the same product names are normalized once per list item
+    return _NON_WORD_RE.sub('', text.lower().strip())
 
 def similarity_score(a: str, b: str) -> float:
     """Calculate similarity between two strings (0-1)"""
     return SequenceMatcher(None, normalize_text(a), normalize_text(b)).ratio()
 
-def find_product_matches(item: str, deals: List[Dict], threshold: float = 0.4) -> List[Dict]:
-    """
-    Find deals matching a shopping list item using fuzzy matching.
-    Returns list of matches sorted by relevance score.
+def _similarity_above(a: str, b: str, threshold: float) -> float:
+    """similarity_score(a, b), or 0.0 when it cannot reach threshold.
+
+    real_quick_ratio/quick_ratio are cheap upper bounds on ratio(), so most
+    non-matching deals are rejected without the full matching-blocks pass.
     """
+    matcher = SequenceMatcher(None, normalize_text(a), normalize_text(b))
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return 0.0
+    return matcher.ratio()
+
+def _scored_matches(item: str, deals: List[Dict], threshold: float):
+    """Yield (score, deal) for every deal matching item at threshold."""
     item_normalized = normalize_text(item)
-    matches = []
     
     for deal in deals:
         product_name = deal.get('product_name', '')
         product_normalized = normalize_text(product_name)
         
-        # Calculate match score
-        score = 0.0
-        
         # Exact substring match (high score)
         if item_normalized in product_normalized or product_normalized in item_normalized:
             score = 0.9
         else:
             # Fuzzy similarity
-            score = similarity_score(item, product_name)
+            score = _similarity_above(item, product_name, threshold)
         
-        # Boost score if category matches common keywords
         if score >= threshold:
-            matches.append({
-                **deal,
-                '_match_score': score,
-                '_matched_item': item
-            })
-    
-    # Sort by score descending, then by price ascending
-    matches.sort(key=lambda x: (-x['_match_score'], float(x.get('price', 999))))
-    return matches
+            yield score, deal
+
+def _match_rank(scored: Tuple[float, Dict]) -> Tuple[float, float]:
+    """Sort key: score descending, then price ascending"""
+    score, deal = scored
+    return (-score, float(deal.get('price', 999)))
+
+def _as_match(scored: Tuple[float, Dict], item: str) -> Dict:
+    score, deal = scored
+    return {
+        **deal,
+        '_match_score': score,
+        '_matched_item': item
+    }
+
+def find_product_matches(item: str, deals: List[Dict], threshold: float = 0.4) -> List[Dict]:
+    """
+    Find deals matching a shopping list item using fuzzy matching.
+    Returns list of matches sorted by relevance score.
+    """
+    scored = sorted(_scored_matches(item, deals, threshold), key=_match_rank)
+    return [_as_match(s, item) for s in scored]
+
+def find_best_product_match(item: str, deals: List[Dict], threshold: float = 0.4) -> Optional[Dict]:
+    """
+    First entry of find_product_matches(), or None.
+    Single pass with min() instead of sorting and copying every match.
+    """
+    best = min(_scored_matches(item, deals, threshold), key=_match_rank, default=None)
+    return _as_match(best, item) if best else None
 
 def find_alternatives(
     item: str,
@@ -74,7 +104,7 @@ def find_alternatives(
         deal_category = deal.get('category', '')
         
         # Check if same/similar product
-        score = similarity_score(item, product_name)
+        score = _similarity_above(item, product_name, 0.5)
         if score >= 0.5:
             alternatives.append({
                 **deal,
@@ -89,9 +119,8 @@ def find_alternatives(
                 '_similarity': 0.3
             })
     
-    # Sort by similarity and limit
-    alternatives.sort(key=lambda x: -x['_similarity'])
-    return alternatives[:limit]
+    # Top matches by similarity (nlargest keeps ties in input order, like a stable sort)
+    return heapq.nlargest(limit, alternatives, key=lambda x: x['_similarity'])
 
 def calculate_store_value(
     store: str,
@@ -1,7 +1,16 @@
 from db import db
 import json
+import re
+import time
+from collections import Counter
+from itertools import islice
 from typing import List, Dict, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def get_api_key() -> Optional[str]:
     result = db.execute_query("SELECT api_key FROM users WHERE unique_id = 'default_user'")
     return result[0]['api_key'] if result and result[0]['api_key'] else None
@@ -10,9 +19,22 @@ def save_api_key(key: str):
     db.execute_query("UPDATE users SET api_key = %s WHERE unique_id = 'default_user'", (key,))
 
 # System Settings
+# Reads are served from this process-local copy instead of a query per request
+# (None = not set). set_system_setting updates it; the TTL, equal to the active
+# deals TTL, picks up rows changed outside the API process (migrations, other
+# workers, manual SQL) so show_synthetic_data goes stale no longer than the deals.
+_system_settings: Dict[str, Optional[str]] = {}
+_system_settings_cached_at: Dict[str, float] = {}
+_SYSTEM_SETTINGS_TTL_SECONDS = 60
+
 def get_system_setting(key: str, default: str = "true") -> str:
-    res = db.execute_query("SELECT setting_value FROM system_settings WHERE setting_key = %s", (key,))
-    return res[0]['setting_value'] if res else default
+    now = time.time()
+    if key not in _system_settings or now - _system_settings_cached_at[key] > _SYSTEM_SETTINGS_TTL_SECONDS:
+        res = db.execute_query("SELECT setting_value FROM system_settings WHERE setting_key = %s", (key,))
+        _system_settings[key] = res[0]['setting_value'] if res else None
+        _system_settings_cached_at[key] = now
+    value = _system_settings[key]
+    return default if value is None else value
 
 def set_system_setting(key: str, value: str):
     # Upsert
@@ -21,6 +43,30 @@ def set_system_setting(key: str, value: str):
         db.execute_query("UPDATE system_settings SET setting_value = %s WHERE setting_key = %s", (value, key))
     else:
         db.execute_query("INSERT INTO system_settings (setting_key, setting_value) VALUES (%s, %s)", (key, value))
+    # No deals invalidation: the active deals cache is keyed by show_synthetic_data,
+    # so toggling it only switches which cached payload is served.
+    _system_settings[key] = value
+    _system_settings_cached_at[key] = time.time()
+
+# Active deals payload cache, one entry per show_synthetic_data value. Deal writes
+# in this module, and the routers that touch the deals table directly, call
+# invalidate_deals_cache(); the TTL covers writes made outside the API process
+# (import scripts, manual SQL).
+_active_deals_cache: Dict[bool, Dict] = {}
+_active_deals_cached_at: Dict[bool, float] = {}
+_ACTIVE_DEALS_TTL_SECONDS = 60
+
+def invalidate_deals_cache():
+    _active_deals_cache.clear()
+    _active_deals_cached_at.clear()
+
+def _deal_key(product_name, store, price) -> tuple:
+    """Content key used to detect duplicate deals."""
+    try:
+        price = round(float(price), 2)
+    except (TypeError, ValueError):
+        price = 0.0
+    return ((product_name or "").strip().lower(), (store or "").strip().lower(), price)
 
 def save_active_deals(deals: List[Dict], store_name: str = "Unknown Store", upload_id: int = None, visibility: str = 'public', source_image_path: str = None):
     # Auto-enrichment imports
@@ -34,6 +80,18 @@ def save_active_deals(deals: List[Dict], store_name: str = "Unknown Store", uplo
         days_until_sunday = 7
     default_valid_until = today + timedelta(days=days_until_sunday)
     
+    # Content keys already persisted for this upload, so re-saving a grown
+    # result list only writes the new deals
+    seen = set()
+    if upload_id is not None:
+        existing = db.execute_query(
+            "SELECT product_name, store, price FROM deals WHERE upload_id = %s", (upload_id,)
+        )
+        seen = {_deal_key(r['product_name'], r['store'], r['price']) for r in existing or []}
+
+    # Collect rows and write them in one executemany round-trip
+    rows = []
+    source_image = None
     for deal in deals:
         # Clean price for Decimal
         p = deal.get('price', '0')
@@ -46,8 +104,13 @@ def save_active_deals(deals: List[Dict], store_name: str = "Unknown Store", uplo
             except:
                 price = 0.0
         
-        # Auto-classify category if not provided
         product_name = deal.get('product_name') or ""
+        key = _deal_key(product_name[:500], (store_name or "")[:100], price)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        # Auto-classify category if not provided
         category = deal.get('category')
         if not category or category == 'Uncategorized':
             try:
@@ -63,45 +126,134 @@ def save_active_deals(deals: List[Dict], store_name: str = "Unknown Store", uplo
         if not image_url and source_image_path and deal.get('bbox'):
             try:
                 from services.image_cropper import crop_product_image
-                image_url = crop_product_image(source_image_path, deal['bbox'], store_name, product_name)
+                if source_image is None:
+                    # Opened once and shared, so the page is decoded once for all crops
+                    from PIL import Image
+                    source_image = Image.open(source_image_path)
+                image_url = crop_product_image(source_image_path, deal['bbox'], store_name, product_name, source_image=source_image)
             except:
                 pass
 
-        db.execute_query(
-            """
-            INSERT INTO deals (upload_id, product_name, price, original_price, unit, store, confidence, source, category, image_url, visibility, valid_until, discount)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (
-                upload_id,
-                product_name[:500],
-                price,
-                (str(deal.get('original_price') or ""))[:100],
-                (deal.get('unit') or "")[:255],
-                (store_name or "")[:100],
-                deal.get('confidence', 0.95),
-                deal.get('source', 'gemini'),
-                category,
-                image_url,
-                visibility,
-                valid_until,
-                deal.get('discount')
-            )
-        )
+        rows.append((
+            upload_id,
+            product_name[:500],
+            price,
+            (str(deal.get('original_price') or ""))[:100],
+            (deal.get('unit') or "")[:255],
+            (store_name or "")[:100],
+            deal.get('confidence', 0.95),
+            deal.get('source', 'gemini'),
+            category,
+            image_url,
+            visibility,
+            valid_until,
+            deal.get('discount')
+        ))
+
+    if source_image is not None:
+        source_image.close()
+
+    if not rows:
+        return
+
+    db.execute_many(
+        """
+        INSERT INTO deals (upload_id, product_name, price, original_price, unit, store, confidence, source, category, image_url, visibility, valid_until, discount)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        rows
+    )
+    invalidate_deals_cache()
 
 def add_deal(deal: Dict, upload_id: int = None, visibility: str = 'public'):
     """Add a single deal to storage (wrapper for save_active_deals)"""
     save_active_deals([deal], store_name=deal.get('store', 'Unknown'), upload_id=upload_id, visibility=visibility)
 
+def _cached_active_deals() -> Dict:
+    """Shared cached payload; never hand this out without copying"""
+    show_synthetic = get_system_setting("show_synthetic_data", "true") == "true"
+    now = time.time()
+    if show_synthetic not in _active_deals_cache or now - _active_deals_cached_at[show_synthetic] > _ACTIVE_DEALS_TTL_SECONDS:
+        _active_deals_cache[show_synthetic] = _load_active_deals(show_synthetic)
+        _active_deals_cached_at[show_synthetic] = now
+    return _active_deals_cache[show_synthetic]
+
 def get_active_deals() -> Dict:
+    # Callers get their own copies so the cached payload can't be mutated
+    deals = [dict(d) for d in _cached_active_deals()["deals"]]
+    return {"deals": deals, "count": len(deals)}
+
+def get_active_deals_json() -> bytes:
+    """Active deals as a JSON body, serialized once per cache refresh"""
+    payload = _cached_active_deals()
+    if "json" not in payload:
+        body = {"deals": payload["deals"], "count": payload["count"]}
+        payload["json"] = orjson.dumps(body) if orjson is not None else json.dumps(body).encode()
+    return payload["json"]
+
+# Pack size in grams, for normalizing prices to per-kg
+GRAMS_RE = re.compile(r'(\d+)\s*g')
+
+def parse_unit_price(deal: Dict) -> float:
+    """Calculate price per unit/kg if possible"""
+    try:
+        price = float(deal.get('price', 0))
+        unit = deal.get('unit', '').lower()
+        # Try to normalize to per-kg or per-piece
+        if 'kg' in unit:
+            return price  # Already per kg
+        elif 'g' in unit:
+            match = GRAMS_RE.search(unit)
+            if match:
+                grams = int(match.group(1))
+                return (price / grams) * 1000  # Convert to per-kg
+        return price  # Fallback to raw price
+    except:
+        return 999.0
+
+def get_cheapest_active_deals(category: str, limit: int = 1, excluded_stores=()) -> List[Dict]:
+    """Active deals in a category, cheapest unit price first.
+
+    Unit prices are parsed and each category ranked once per cache fill
+    (stable order, so ties keep their active-deals order).
+    """
+    payload = _cached_active_deals()
+    if "by_unit_price" not in payload:
+        by_category = {}
+        for deal in payload["deals"]:
+            by_category.setdefault(deal.get("category"), []).append(deal)
+        for deals in by_category.values():
+            deals.sort(key=parse_unit_price)
+        payload["by_unit_price"] = by_category
+    ranked = payload["by_unit_price"].get(category, [])
+    if excluded_stores:
+        ranked = (d for d in ranked if d.get('store') not in excluded_stores)
+    return [dict(d) for d in islice(ranked, limit)]
+
+def get_active_deals_breakdown() -> Dict:
+    """Active deal count with per-store / per-category counts, cached with the deals"""
+    payload = _cached_active_deals()
+    if "breakdown" not in payload:
+        deals = payload["deals"]
+        payload["breakdown"] = {
+            "total_deals": len(deals),
+            "stores": dict(Counter(deal.get("store", "Unknown") for deal in deals)),
+            "categories": dict(Counter(deal.get("category", "Other") for deal in deals))
+        }
+    breakdown = payload["breakdown"]
+    return {
+        "total_deals": breakdown["total_deals"],
+        "stores": dict(breakdown["stores"]),
+        "categories": dict(breakdown["categories"])
+    }
+
+def _load_active_deals(show_synthetic: bool) -> Dict:
     # Retrieve deals from the most recent upload(s) or just all recent deals
     # Let's get deals from the last 7 days
     # Filtering: Return Public OR Private (since we assume single user for now, private is fine to return)
-    # Check synthetic visibility
-    show_synthetic = get_system_setting("show_synthetic_data", "true") == "true"
-    
+    # Synthetic visibility (show_synthetic_data) is part of the cache key
     query = """
-        SELECT product_name, price, original_price, unit, store, confidence, source, category, image_url, created_at, visibility
+        SELECT product_name, price, original_price, unit, store, source, category, image_url, created_at, visibility
         FROM deals 
         WHERE 1=1
     """
@@ -112,21 +264,22 @@ def get_active_deals() -> Dict:
     query += " ORDER BY created_at DESC LIMIT 100"
     
     results = db.execute_query(query)
-    # Format for frontend
-    formatted = []
-    for r in results:
-        formatted.append({
+    # Format for frontend; every key is in the SELECT, so no per-row defaults
+    formatted = [
+        {
             "product_name": r['product_name'],
             "price": str(r['price']), # Convert Decimal to string
             "original_price": r['original_price'],
             "unit": r['unit'],
             "store": r['store'],
-            "source": r.get('source', 'gemini'),
+            "source": r['source'],
             "category": r['category'],
             "image_url": r['image_url'],
-            "visibility": r.get('visibility', 'public'),
+            "visibility": r['visibility'],
             "created_at": str(r['created_at'])
-        })
+        }
+        for r in results
+    ]
     return {"deals": formatted, "count": len(formatted)}
 
 def update_deal(deal_id: int, updates: Dict) -> bool:
@@ -144,6 +297,7 @@ def update_deal(deal_id: int, updates: Dict) -> bool:
     
     try:
         db.execute_query(f"UPDATE deals SET {set_clause} WHERE id = %s", tuple(values))
+        invalidate_deals_cache()
         return True
     except Exception as e:
         print(f"Error updating deal {deal_id}: {e}")
@@ -153,6 +307,7 @@ def delete_deal(deal_id: int) -> bool:
     """Delete a specific deal"""
     try:
         db.execute_query("DELETE FROM deals WHERE id = %s", (deal_id,))
+        invalidate_deals_cache()
         return True
     except Exception as e:
         print(f"Error deleting deal {deal_id}: {e}")
@@ -165,43 +320,45 @@ def delete_deals(deal_ids: List[int]) -> bool:
     try:
         placeholders = ', '.join(['%s'] * len(deal_ids))
         db.execute_query(f"DELETE FROM deals WHERE id IN ({placeholders})", tuple(deal_ids))
+        invalidate_deals_cache()
         return True
     except Exception as e:
         print(f"Error deleting deals {deal_ids}: {e}")
         return False
 
+# Upper bound on one admin search page, so a single request can't pull the whole table
+SEARCH_MAX_LIMIT = 200
+
 def search_deals(query: str = "", page: int = 1, limit: int = 50) -> Dict:
     """Search deals with pagination"""
+    page = max(page, 1)
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
     offset = (page - 1) * limit
     
-    # Base query
-    sql = """
-        SELECT * FROM deals 
-        WHERE 1=1
-    """
-    params = []
-    
     # Filter by query (product name or store)
+    where = " WHERE 1=1"
+    params = []
     if query:
-        sql += " AND (product_name ILIKE %s OR store ILIKE %s)"
+        where += " AND (product_name ILIKE %s OR store ILIKE %s)"
         search_term = f"%{query}%"
         params.extend([search_term, search_term])
         
-    # Count total for pagination
-    count_sql = f"SELECT COUNT(*) as total FROM ({sql}) as sub"
-    total_res = db.execute_query(count_sql, tuple(params))
+    # Count total for pagination (directly, not over a SELECT * subquery)
+    total_res = db.execute_query("SELECT COUNT(*) as total FROM deals" + where, tuple(params))
     total = total_res[0]['total'] if total_res else 0
     
-    # Add sorting and pagination
-    sql += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
+    # Only the columns the admin table shows, sorted and paginated
+    sql = """
+        SELECT id, product_name, price, original_price, unit, store, category, image_url, created_at
+        FROM deals
+    """ + where + " ORDER BY created_at DESC LIMIT %s OFFSET %s"
     params.extend([limit, offset])
     
     results = db.execute_query(sql, tuple(params))
     
     # Format dates/decimals
-    formatted = []
-    for r in results:
-        formatted.append({
+    formatted = [
+        {
             "id": r['id'],
             "product_name": r['product_name'],
             "price": str(r['price']),
@@ -211,7 +368,9 @@ def search_deals(query: str = "", page: int = 1, limit: int = 50) -> Dict:
             "category": r['category'],
             "image_url": r['image_url'],
             "created_at": str(r['created_at'])
-        })
+        }
+        for r in results
+    ]
         
     return {
         "deals": formatted,
@@ -221,18 +380,43 @@ def search_deals(query: str = "", page: int = 1, limit: int = 50) -> Dict:
         "pages": (total + limit - 1) // limit
     }
 
+# Shopping list read cache; every write below goes through this module and
+# invalidates it, so endpoints that read the list after a mutation hit the DB once.
+# Writers bump the generation, and a reader only stores rows if no write happened
+# during its SELECT; the short TTL covers writes from other worker processes.
+_shopping_list_cache: Optional[List[str]] = None
+_shopping_list_cached_at = 0.0
+_shopping_list_generation = 0
+_SHOPPING_LIST_TTL_SECONDS = 5
+
+def _invalidate_shopping_list():
+    global _shopping_list_cache, _shopping_list_generation
+    _shopping_list_generation += 1
+    _shopping_list_cache = None
+
 def get_shopping_list() -> List[str]:
+    global _shopping_list_cache, _shopping_list_cached_at
+    now = time.time()
+    if _shopping_list_cache is not None and now - _shopping_list_cached_at <= _SHOPPING_LIST_TTL_SECONDS:
+        return list(_shopping_list_cache)
+    generation = _shopping_list_generation
     results = db.execute_query("SELECT item FROM shopping_list ORDER BY created_at DESC")
-    return [r['item'] for r in results]
+    items = [r['item'] for r in results]
+    if generation == _shopping_list_generation:
+        _shopping_list_cache = items
+        _shopping_list_cached_at = now
+    return list(items)
 
 def add_to_list(item: str):
     try:
         db.execute_query("INSERT INTO shopping_list (item) VALUES (%s)", (item,))
     except Exception:
         pass # Ignore duplicates
+    _invalidate_shopping_list()
 
 def remove_from_list(item: str):
     db.execute_query("DELETE FROM shopping_list WHERE item = %s", (item,))
+    _invalidate_shopping_list()
 
 def get_watchlist() -> List[str]:
     results = db.execute_query("SELECT item FROM watchlist ORDER BY created_at DESC")
@@ -252,8 +436,15 @@ def log_upload(filename: str, deal_count: int, file_path: str, file_hash: str, v
         "INSERT INTO uploads (filename, file_hash, file_path, deal_count, visibility) VALUES (%s, %s, %s, %s, %s)",
         (filename, file_hash, file_path, deal_count, visibility)
     )
+    invalidate_spending_stats()
     return upload_id
 
+def delete_upload(upload_id: int):
+    # ON DELETE CASCADE in schema handles deals
+    db.execute_query("DELETE FROM uploads WHERE id = %s", (upload_id,))
+    invalidate_deals_cache()
+    invalidate_spending_stats()
+
 def get_upload_history() -> List[Dict]:
     results = db.execute_query("SELECT * FROM uploads ORDER BY timestamp DESC")
     for r in results:
@@ -262,8 +453,11 @@ def get_upload_history() -> List[Dict]:
 
 def reset_user_data():
     db.execute_query("TRUNCATE TABLE shopping_list")
+    _invalidate_shopping_list()
     db.execute_query("TRUNCATE TABLE deals")
+    invalidate_deals_cache()
     db.execute_query("TRUNCATE TABLE uploads") 
+    invalidate_spending_stats()
     # Keep watchlist and settings? Or clear all? 
     # Keep watchlist and settings? Or clear all? 
     # User said "Reset All Data" usually means transactional data.
@@ -298,6 +492,7 @@ def add_receipt(store_name: str, total: float, date: str, image_path: str, items
         "INSERT INTO receipts (store_name, total_amount, purchase_date, image_path, items) VALUES (%s, %s, %s, %s, %s)",
         (store_name, total, date, image_path, items_json)
     )
+    invalidate_spending_stats()
 
 def get_receipts() -> List[Dict]:
     results = db.execute_query("SELECT * FROM receipts ORDER BY purchase_date DESC")
@@ -314,6 +509,7 @@ def get_receipts() -> List[Dict]:
 
 def delete_receipt(receipt_id: int):
     db.execute_query("DELETE FROM receipts WHERE id = %s", (receipt_id,))
+    invalidate_spending_stats()
 
 def get_ai_token() -> Optional[str]:
     """
@@ -377,24 +573,52 @@ def update_user_settings(settings: Dict):
     db.execute_query("UPDATE users SET settings = %s WHERE unique_id = 'default_user'", (json.dumps(current),))
 
 
+# Receipt/upload aggregates behind get_spending_stats, rebuilt after receipt or upload writes
+_spending_aggregates: Optional[Dict] = None
+
+def invalidate_spending_stats():
+    global _spending_aggregates
+    _spending_aggregates = None
+
+def _load_spending_aggregates() -> Dict:
+    """Monthly spend, lifetime total and counts, pre-binned by month in SQL"""
+    import calendar
+
+    # One row per calendar month instead of one per receipt
+    rows = db.execute_query(
+        """
+        SELECT MONTH(purchase_date) AS month, SUM(total_amount) AS total, COUNT(*) AS n
+        FROM receipts
+        GROUP BY MONTH(purchase_date)
+        """
+    ) or []
+    monthly_spend = {}
+    total_spent = 0.0
+    receipt_count = 0
+    for r in rows:
+        total = float(r['total'] or 0)
+        total_spent += total
+        receipt_count += r['n']
+        if r['month']:
+            monthly_spend[calendar.month_abbr[r['month']]] = total # Jan, Feb...
+
+    uploads = db.execute_query("SELECT COUNT(*) AS n FROM uploads")
+    return {
+        "monthly_spend": monthly_spend,
+        "total_spent": total_spent,
+        "receipt_count": receipt_count,
+        "upload_count": uploads[0]['n'] if uploads else 0
+    }
+
 def get_spending_stats() -> Dict:
-    # Aggregate receipts by month
-    receipts = get_receipts()
-    from collections import defaultdict
+    global _spending_aggregates
     from datetime import datetime
-    
-    monthly_spend = defaultdict(float)
-    
-    for r in receipts:
-        try:
-            # date format might be YYYY-MM-DD or similar string
-            date_str = str(r['purchase_date']).split(' ')[0] # Handle datetime string
-            dt = datetime.strptime(date_str, '%Y-%m-%d')
-            month_key = dt.strftime('%b') # Jan, Feb...
-            monthly_spend[month_key] += float(r['total_amount'])
-        except Exception as e:
-            print(f"Error parsing receipt date/total: {e}")
-            continue
+
+    # Aggregate receipts by month (cached until receipts or uploads change)
+    if _spending_aggregates is None:
+        _spending_aggregates = _load_spending_aggregates()
+    aggregates = _spending_aggregates
+    monthly_spend = aggregates["monthly_spend"]
             
     # Ensure we have some data even if empty
     months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
@@ -407,8 +631,8 @@ def get_spending_stats() -> Dict:
     current_total = monthly_spend.get(current_month, 0.0)
     
     # Gamification Logic
-    upload_count = len(get_upload_history())
-    receipt_count = len(receipts)
+    upload_count = aggregates["upload_count"]
+    receipt_count = aggregates["receipt_count"]
     
     # Points Strategy: 50 pts per receipt, 20 pts per upload
     points = (receipt_count * 50) + (upload_count * 20)
@@ -429,13 +653,13 @@ def get_spending_stats() -> Dict:
         badges.append("Budget Master")
         
     # Mock saved amount (10% of total spent for now, until we extract real savings)
-    total_spent_lifetime = sum(float(r['total_amount']) for r in receipts)
+    total_spent_lifetime = aggregates["total_spent"]
     total_saved = total_spent_lifetime * 0.12 
 
     return {
         "chart_data": data,
         "current_month_total": current_total,
-        "total_receipts": len(receipts),
+        "total_receipts": receipt_count,
         "gamification": {
             "points": points,
             "level": level,
@@ -17,3 +17,17 @@ try:
     print("Model initialized successfully.")
 except Exception as e:
     print(f"Error initializing model: {e}")
+
+# Each API key must get its own client, or calls can run under another caller's key
+try:
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from services.ai_client import get_generative_model
+    model_a = get_generative_model("test-key-a", "gemini-2.5-flash-lite")
+    model_b = get_generative_model("test-key-b", "gemini-2.5-flash-lite")
+    if model_a._client is model_b._client:
+        print("❌ Two API keys share one client")
+        sys.exit(1)
+    print("✅ Two API keys get two clients")
+except Exception as e:
+    print(f"Error checking per-key clients: {e}")
+    sys.exit(1)